@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the parallel folder import of the 'import_local_folder' module against the serial import.
+
+Creates a folder with many small text files (or uses an existing folder, e.g. on a network mount), and prints the
+throughput (files per second) of the serial import and of the parallel import with different worker counts.
+
+Usage:
+
+    python scripts/benchmarks/import_folder.py --files 50000
+    python scripts/benchmarks/import_folder.py --path /mnt/corpus
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import typing
+
+from kiara import Kiara
+
+
+def create_folder(path: str, files: int, files_per_folder: int = 1000) -> str:
+
+    for i in range(files):
+        folder = os.path.join(path, f"folder_{i // files_per_folder}")
+        if i % files_per_folder == 0:
+            os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"file_{i}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"Content of file {i}.\n" * 10)
+    return path
+
+
+def run_import(
+    kiara: Kiara, path: str, module_config: typing.Mapping[str, typing.Any]
+) -> typing.Tuple[float, int]:
+
+    module = kiara.create_module(
+        "import_folder_benchmark", "import_local_folder", module_config=module_config
+    )
+    start = time.time()
+    result = module.run(path=path)
+    return time.time() - start, len(result["file_bundle"].included_files)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--files", type=int, default=20000)
+    parser.add_argument(
+        "--path", help="Import this folder, instead of creating a temporary one."
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    kiara = Kiara.instance()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+
+        path = args.path if args.path else create_folder(temp_dir, args.files)
+
+        serial, files = run_import(kiara, path, {})
+        print(f"files: {files}, path: {path}")
+        print(f"{'workers':<10}{'seconds':>10}{'files/s':>10}{'speedup':>10}")
+        print(f"{'serial':<10}{serial:>10.2f}{files / serial:>10.0f}{1.0:>10.2f}")
+
+        for workers in args.workers:
+            duration, _ = run_import(
+                kiara, path, {"workers": workers, "progress_interval": 0}
+            )
+            print(
+                f"{workers:<10}{duration:>10.2f}{files / duration:>10.0f}{serial / duration:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the parallel execution modes of the 'map' module against serial execution.
+
+Uses a child module per item, without its whole-array implementation ('extract_date' by default, which extracts the
+date substring with a regex and parses it with 'strptime', and only falls back to dateutil for dates that don't match
+the configured format -- none of the generated ones). The per-item work is therefore light, so the numbers mostly
+reflect the overhead of the executors. Prints the speedup for each executor type and worker count, up to the number of
+available CPUs.
+
+Usage:
+
+    python scripts/benchmarks/map_parallel.py --items 100000
+"""
+
+import argparse
+import os
+import pyarrow as pa
+import random
+import time
+import typing
+
+from kiara import Kiara
+
+
+def create_file_names(items: int) -> pa.Array:
+
+    rnd = random.Random(0)
+    file_names = []
+    for i in range(items):
+        year = rnd.randint(1880, 1930)
+        month = rnd.randint(1, 12)
+        day = rnd.randint(1, 28)
+        file_names.append(
+            f"sn{rnd.randint(10000000, 99999999)}_{year}-{month:02d}-{day:02d}_ed-{i}_seq-1_ocr.txt"
+        )
+    return pa.array(file_names)
+
+
+def run_map(
+    kiara: Kiara, array: pa.Array, module_config: typing.Mapping[str, typing.Any]
+) -> float:
+
+    module = kiara.create_module("map_benchmark", "map", module_config=module_config)
+    start = time.perf_counter()
+    module.run(array=array)
+    return time.perf_counter() - start
+
+
+def worker_counts(max_workers: int) -> typing.List[int]:
+
+    counts = []
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers = workers * 2
+    counts.append(max_workers)
+    return counts
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--module-type", default="extract_date")
+    parser.add_argument(
+        "--executors",
+        nargs="+",
+        default=["process", "thread"],
+        choices=["process", "thread"],
+    )
+    args = parser.parse_args()
+
+    kiara = Kiara.instance()
+    array = create_file_names(args.items)
+    base_config = {"module_type": args.module_type, "use_array_implementation": False}
+
+    serial = run_map(kiara, array, base_config)
+    print(f"items: {args.items}, cpus: {os.cpu_count()}")
+    print(f"{'executor':<10}{'workers':>8}{'seconds':>10}{'speedup':>10}")
+    print(f"{'serial':<10}{1:>8}{serial:>10.2f}{1.0:>10.2f}")
+
+    for executor in args.executors:
+        for workers in worker_counts(os.cpu_count() or 1):
+            config = dict(base_config)
+            config.update(
+                executor=executor, workers=workers, chunk_size=args.chunk_size
+            )
+            duration = run_map(kiara, array, config)
+            print(
+                f"{executor:<10}{workers:>8}{duration:>10.2f}{serial / duration:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the throughput of the fused 'xor' pipeline against the unfused (regular) pipeline.
+
+Runs both variants with single boolean inputs (to measure per-run overhead), and the '*_array' variant of the pipeline
+(whose inputs are declared as arrays) with boolean arrays (to measure throughput per item), and prints runs and items
+per second.
+
+Usage:
+
+    python scripts/benchmarks/pipeline_fusion.py --runs 1000 --array-size 1000000
+"""
+
+import argparse
+import pyarrow as pa
+import random
+import time
+import typing
+
+from kiara import Kiara
+
+
+def measure(
+    module: typing.Any, runs: int, inputs: typing.Mapping[str, typing.Any]
+) -> float:
+
+    start = time.perf_counter()
+    for _ in range(runs):
+        module.run(**inputs)
+    return time.perf_counter() - start
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--pipeline", default="xor")
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--array-size", type=int, default=1000000)
+    args = parser.parse_args()
+
+    kiara = Kiara.instance()
+    array_pipeline = f"{args.pipeline}_array"
+    variants = []
+    for name, pipeline, inputs_type in [
+        (args.pipeline, args.pipeline, "single"),
+        (array_pipeline, array_pipeline, "array"),
+    ]:
+        variants.append(
+            ("unfused", inputs_type, kiara.create_module(f"unfused_{name}", pipeline))
+        )
+        variants.append(
+            (
+                "fused",
+                inputs_type,
+                kiara.create_module(
+                    f"fused_{name}",
+                    "fused_pipeline",
+                    module_config={"pipeline": pipeline},
+                ),
+            )
+        )
+
+    rnd = random.Random(0)
+    arrays = {
+        "a": pa.array([rnd.random() < 0.5 for _ in range(args.array_size)]),
+        "b": pa.array([rnd.random() < 0.5 for _ in range(args.array_size)]),
+    }
+
+    print(f"pipelines: {args.pipeline}, {array_pipeline}")
+    print(f"{'variant':<10}{'inputs':<10}{'seconds':>10}{'runs/s':>12}{'items/s':>14}")
+
+    for name, inputs_type, module in variants:
+
+        if inputs_type == "single":
+            runs = args.runs
+            duration = measure(module, runs, {"a": True, "b": False})
+            items = runs
+        else:
+            runs = max(args.runs // 100, 1)
+            duration = measure(module, runs, arrays)
+            items = runs * args.array_size
+        print(
+            f"{name:<10}{inputs_type:<10}{duration:>10.3f}{runs / duration:>12.1f}{items / duration:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import functools
 import logging
 import os
 
@@ -12,14 +13,25 @@ __author__ = """Markus Binsteiner"""
 __email__ = "markus.binsteiner@uni.lu"
 
 
+@functools.lru_cache(maxsize=None)
 def get_version():
-    from pkg_resources import DistributionNotFound, get_distribution
+    """Return the version of this package.
 
+    Uses 'importlib.metadata' (or its backport on older Python versions), which only looks up the metadata of this
+    package, instead of 'pkg_resources', which scans all installed distributions when it is imported.
+    """
+
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:
+        from importlib_metadata import PackageNotFoundError, version  # type: ignore
+
+    __version__ = None
     try:
         # Change here if project is renamed and does not equal the package name
         dist_name = __name__
-        __version__ = get_distribution(dist_name).version
-    except DistributionNotFound:
+        __version__ = version(dist_name)
+    except PackageNotFoundError:
 
         try:
             version_file = os.path.join(os.path.dirname(__file__), "version.txt")
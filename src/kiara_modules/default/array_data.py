@@ -1,12 +1,233 @@
 # -*- coding: utf-8 -*-
-import pyarrow as pa
+import json
+import os
+import threading
 import typing
-from pydantic import Field
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pydantic import Field, validator
 
 from kiara import KiaraModule
 from kiara.config import KiaraModuleConfig
 from kiara.data.values import ValueSchema
 from kiara.module import StepInputs, StepOutputs
+from kiara_modules.default.instrumentation import instrumented
+
+if typing.TYPE_CHECKING:
+    import pyarrow as pa
+
+
+def combine_chunks(array: typing.Union["pa.Array", "pa.ChunkedArray"]) -> "pa.Array":
+    """Return a single, contiguous array for an array or chunked array."""
+
+    import pyarrow as pa
+
+    if not isinstance(array, pa.ChunkedArray):
+        return array
+
+    if array.num_chunks == 0:
+        return pa.array([], type=array.type)
+    elif array.num_chunks == 1:
+        return array.chunk(0)
+
+    return pa.concat_arrays(array.chunks)
+
+
+def dictionary_encode(
+    array: typing.Union["pa.Array", "pa.ChunkedArray"],
+) -> typing.Tuple["pa.Array", "pa.Array"]:
+    """Return the distinct values of an array, and the indices of every item in those values (null for null items).
+
+    Nested (list, struct, ...) arrays, which have no dictionary encoding kernel, are encoded item by item, by the string
+    form of the items (which is what a mapped module gets as input).
+    """
+
+    import pyarrow as pa
+
+    combined = combine_chunks(array)
+    if not pa.types.is_nested(combined.type):
+        encoded = combined.dictionary_encode()
+        return encoded.dictionary, encoded.indices
+
+    positions: typing.Dict[str, int] = {}
+    values: typing.List[typing.Any] = []
+    indices: typing.List[typing.Optional[int]] = []
+    for item in combined.to_pylist():
+        if item is None:
+            indices.append(None)
+            continue
+        key = str(item)
+        index = positions.get(key, None)
+        if index is None:
+            index = positions[key] = len(values)
+            values.append(item)
+        indices.append(index)
+
+    return pa.array(values, type=combined.type), pa.array(indices, type=pa.int32())
+
+
+def get_item_key(item: typing.Any) -> typing.Hashable:
+    """Return a key for an item in the result cache: the item itself, or its string form if it's not hashable.
+
+    Mapped modules get the string form of items as input, so items with the same string form have the same result.
+    """
+
+    try:
+        hash(item)
+    except TypeError:
+        return str(item)
+    return item
+
+
+def map_items(
+    module: KiaraModule,
+    input_name: str,
+    output_name: str,
+    items: typing.Iterable[typing.Any],
+) -> typing.List[typing.Any]:
+    """Run a module with a single input and a single output once for every item.
+
+    Null items are not processed, they result in a null value.
+    """
+
+    result: typing.List[typing.Any] = []
+    for item in items:
+        if item is None:
+            result.append(None)
+            continue
+
+        s = str(item)
+        init_data = {input_name: s}
+
+        r = module.run(**init_data)
+        result.append(r[output_name])
+
+    return result
+
+
+def to_chunked_array(
+    results: typing.Iterable[typing.List[typing.Any]],
+) -> "pa.ChunkedArray":
+    """Assemble lists of (mapped) values into a chunked array, one chunk per list.
+
+    Chunks that only contain null values are cast to the type of the other chunks, so all chunks end up with the same type.
+    """
+
+    import pyarrow as pa
+
+    chunks = [pa.array(r) for r in results]
+
+    data_type = pa.null()
+    for chunk in chunks:
+        if chunk.type != pa.null():
+            data_type = chunk.type
+            break
+
+    chunks = [
+        pa.nulls(len(chunk), type=data_type) if chunk.type == pa.null() else chunk
+        for chunk in chunks
+    ]
+    return pa.chunked_array(chunks, type=data_type)
+
+
+_NOT_CACHED = object()
+
+
+class ResultCache(object):
+    """A bounded, thread-safe cache that evicts the least recently used items first."""
+
+    def __init__(self, max_size: int):
+
+        self._max_size: int = max_size
+        self._items: "OrderedDict[typing.Any, typing.Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @max_size.setter
+    def max_size(self, max_size: int) -> None:
+
+        with self._lock:
+            self._max_size = max_size
+            self._evict()
+
+    def _evict(self) -> None:
+
+        while len(self._items) > self._max_size:
+            self._items.popitem(last=False)
+
+    def get(self, key: typing.Any, default: typing.Any = None) -> typing.Any:
+
+        with self._lock:
+            if key not in self._items.keys():
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key: typing.Any, value: typing.Any) -> None:
+
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            self._evict()
+
+    def __len__(self):
+        return len(self._items)
+
+
+_result_caches: typing.Dict[str, ResultCache] = {}
+_result_caches_lock = threading.Lock()
+
+
+def get_result_cache(
+    module_type: str, module_config: typing.Mapping[str, typing.Any], max_size: int
+) -> ResultCache:
+    """Return the (shared) result cache for a module type and module config combination."""
+
+    cache_key = json.dumps(
+        {"module_type": module_type, "module_config": module_config},
+        sort_keys=True,
+        default=str,
+    )
+    with _result_caches_lock:
+        cache = _result_caches.get(cache_key, None)
+        if cache is None:
+            cache = ResultCache(max_size=max_size)
+            _result_caches[cache_key] = cache
+        elif cache.max_size != max_size:
+            cache.max_size = max_size
+
+    return cache
+
+
+_worker_module: typing.Optional[KiaraModule] = None
+
+
+def _init_map_worker_process(
+    module_type: str, module_config: typing.Mapping[str, typing.Any]
+) -> None:
+
+    from kiara import Kiara
+
+    global _worker_module
+    _worker_module = Kiara.instance().create_module(
+        "_map_module", module_type, module_config=module_config
+    )
+
+
+def _map_items_in_worker_process(
+    items: typing.List[typing.Any],
+) -> typing.List[typing.Any]:
+
+    assert _worker_module is not None
+    return map_items(
+        _worker_module,
+        list(_worker_module.input_names)[0],
+        list(_worker_module.output_names)[0],
+        items,
+    )
 
 
 class MapModuleConfig(KiaraModuleConfig):
@@ -17,9 +238,65 @@ class MapModuleConfig(KiaraModuleConfig):
     module_config: typing.Optional[typing.Dict[str, typing.Any]] = Field(
         description="The config for the kiara module.", default_factory=dict
     )
+    use_array_implementation: bool = Field(
+        description="Whether to use the whole-array implementation of the child module (if it provides one), instead of running it once per array item.",
+        default=True,
+    )
+    executor: typing.Optional[str] = Field(
+        description="Whether to process the array items in parallel, in a pool of threads ('thread') or processes ('process'). Only used if the array can't be processed by a whole-array implementation of the child module. By default, items are processed serially.",
+        default=None,
+    )
+    workers: typing.Optional[int] = Field(
+        description="The number of parallel workers (defaults to the number of CPUs). Every worker uses its own instance of the child module.",
+        default=None,
+    )
+    chunk_size: int = Field(
+        description="The number of array items that are sent to a parallel worker at a time.",
+        default=10000,
+    )
+    memoize: bool = Field(
+        description="Whether to run the child module only once per distinct input value, instead of once per array item.",
+        default=False,
+    )
+    cache_size: int = Field(
+        description="The maximum number of results to keep in a cache that is shared by all map modules with the same 'module_type' and 'module_config' (across invocations). Set to 0 to disable the cache.",
+        default=0,
+    )
+
+    @validator("executor")
+    def _validate_executor(cls, v):
+
+        allowed = ["thread", "process"]
+        if v is not None and v not in allowed:
+            raise ValueError(f"'executor' must be one of: [{allowed}]")
+        return v
+
+    @validator("workers", "chunk_size")
+    def _validate_positive(cls, v):
+
+        if v is not None and v < 1:
+            raise ValueError("Value must be a positive integer.")
+        return v
 
+    @validator("cache_size")
+    def _validate_cache_size(cls, v):
 
+        if v < 0:
+            raise ValueError("Value must not be negative.")
+        return v
+
+
+@instrumented
 class MapModule(KiaraModule):
+    """Map a list of values into another list of values, using a module with one input and one output.
+
+    If the child module implements a ``process_array`` method (taking the input array, returning the output array), that
+    method is used to process the whole array at once. Otherwise, the child module is run once for every item in the array,
+    either serially or -- if the ``executor`` config option is set -- in chunks, by a pool of parallel workers.
+
+    If ``memoize`` is set, the child module is only run once for every distinct value in the input array. Null items always
+    result in null values, without the child module being run for them.
+    """
 
     _config_cls = MapModuleConfig
 
@@ -47,22 +324,132 @@ class MapModule(KiaraModule):
 
         module_name = self.get_config_value("module_type")
         module_config = self.get_config_value("module_config")
-        create_date = self._kiara.create_module(
+        map_module = self._kiara.create_module(
             "_map_module", module_name, module_config=module_config
         )
 
-        assert len(create_date.input_names) == 1
-        assert len(create_date.output_names) == 1
-        create_date_input_name = list(create_date.input_names)[0]
-        create_date_output_name = list(create_date.output_names)[0]
+        assert len(map_module.input_names) == 1
+        assert len(map_module.output_names) == 1
+
+        if self.get_config_value("use_array_implementation"):
+            process_array = getattr(map_module, "process_array", None)
+            if callable(process_array):
+                outputs.array = process_array(input_array)
+                return
+
+        if self.get_config_value("memoize"):
+            dictionary, indices = dictionary_encode(input_array)
+            mapped = self.map_values(map_module, dictionary)
+            outputs.array = mapped.take(indices)
+        else:
+            outputs.array = self.map_values(map_module, input_array)
+
+    def map_values(
+        self,
+        map_module: KiaraModule,
+        values: typing.Union["pa.Array", "pa.ChunkedArray"],
+    ) -> "pa.ChunkedArray":
+        """Map an array of values by running the child module, using the configured executor and result cache."""
+
+        executor_type = self.get_config_value("executor")
+        if executor_type is None:
+            chunk_size = max(len(values), 1)
+        else:
+            chunk_size = self.get_config_value("chunk_size")
+
+        chunks = [
+            values.slice(offset, chunk_size).to_pylist()
+            for offset in range(0, len(values), chunk_size)
+        ]
+
+        cache_size = self.get_config_value("cache_size")
+        if not cache_size:
+            return to_chunked_array(self.map_chunks(map_module, chunks))
+
+        cache = get_result_cache(
+            self.get_config_value("module_type"),
+            self.get_config_value("module_config"),
+            max_size=cache_size,
+        )
+
+        known: typing.Dict[typing.Any, typing.Any] = {}
+        pending = []
+        for chunk in chunks:
+            pending_chunk = []
+            for item in chunk:
+                if item is None:
+                    continue
+                key = get_item_key(item)
+                if key in known.keys():
+                    continue
+                result = cache.get(key, _NOT_CACHED)
+                if result is _NOT_CACHED:
+                    pending_chunk.append(item)
+                    known[key] = _NOT_CACHED
+                else:
+                    known[key] = result
+            pending.append(pending_chunk)
+
+        for pending_chunk, results in zip(
+            pending, self.map_chunks(map_module, pending)
+        ):
+            for item, result in zip(pending_chunk, results):
+                key = get_item_key(item)
+                known[key] = result
+                cache.put(key, result)
+
+        return to_chunked_array(
+            [None if item is None else known[get_item_key(item)] for item in chunk]
+            for chunk in chunks
+        )
+
+    def map_chunks(
+        self, map_module: KiaraModule, chunks: typing.List[typing.List[typing.Any]]
+    ) -> typing.Iterable[typing.List[typing.Any]]:
+        """Run the child module for every item in a list of chunks, and return the results for each chunk, in order."""
+
+        map_module_input_name = list(map_module.input_names)[0]
+        map_module_output_name = list(map_module.output_names)[0]
+
+        executor_type = self.get_config_value("executor")
+        if executor_type is None:
+            return [
+                map_items(
+                    map_module, map_module_input_name, map_module_output_name, chunk
+                )
+                for chunk in chunks
+            ]
+
+        module_name = self.get_config_value("module_type")
+        module_config = self.get_config_value("module_config")
+
+        workers = self.get_config_value("workers")
+        if not workers:
+            workers = os.cpu_count() or 1
+
+        executor: Executor
+        if executor_type == "process":
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_map_worker_process,
+                initargs=(module_name, module_config),
+            )
+            map_func: typing.Callable = _map_items_in_worker_process
+        else:
+            executor = ThreadPoolExecutor(max_workers=workers)
+            thread_data = threading.local()
 
-        result = []
-        for text in input_array:
-            s = str(text)
-            init_data = {create_date_input_name: s}
+            def map_func(items: typing.List[typing.Any]) -> typing.List[typing.Any]:
 
-            r = create_date.run(**init_data)
-            result.append(r[create_date_output_name])
+                module = getattr(thread_data, "module", None)
+                if module is None:
+                    module = self._kiara.create_module(
+                        "_map_module", module_name, module_config=module_config
+                    )
+                    thread_data.module = module
+                return map_items(
+                    module, map_module_input_name, map_module_output_name, items
+                )
 
-        test = pa.array(result)
-        outputs.array = test
+        with executor:
+            return list(executor.map(map_func, chunks))
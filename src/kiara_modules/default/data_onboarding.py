@@ -1,22 +1,519 @@
 # -*- coding: utf-8 -*-
+import codecs
+import hashlib
+import json
+import mimetypes
+import os
+import tarfile
+import time
 import typing
-from pydantic import Field
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
+from datetime import datetime
+from pydantic import Field, validator
 
 from kiara import KiaraModule
 from kiara.config import KiaraModuleConfig
 from kiara.data.types.files import FileBundleModel, FileModel, FolderImportConfig
 from kiara.data.values import ValueSchema
+from kiara.exceptions import KiaraProcessingException
 from kiara.module import StepInputs, StepOutputs
+from kiara_modules.default import log
+from kiara_modules.default.defaults import KIARA_MODULES_DEFAULT_IMPORT_MANIFESTS_FOLDER
+from kiara_modules.default.instrumentation import instrumented
+
+HASH_CHUNK_SIZE = 1024 * 1024
+MANIFEST_VERSION = 2
+ARCHIVE_MEMBER_SEPARATOR = "!/"
+
+
+def _scan_folder(
+    path: str, import_config: FolderImportConfig
+) -> typing.Tuple[typing.List[str], typing.List[str]]:
+    """Scan a single folder, and return the paths of its (not excluded) sub-folders, and of its included files."""
+
+    exclude_dirs = import_config.exclude_dirs
+    include_files = import_config.include_files
+
+    folders = []
+    files = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if exclude_dirs and any(entry.name.endswith(d) for d in exclude_dirs):
+                    continue
+                folders.append(entry.path)
+            elif entry.is_file():
+                if include_files and not any(
+                    entry.name.endswith(f) for f in include_files
+                ):
+                    continue
+                files.append(entry.path)
+
+    return folders, files
+
+
+def walk_folder(
+    path: str,
+    import_config: FolderImportConfig,
+    executor: typing.Optional[Executor] = None,
+) -> typing.List[str]:
+    """Return the (sorted) paths of all included files in a folder and its sub-folders.
+
+    Excluded folders are pruned before they are scanned. If an executor is provided, folders are scanned in parallel.
+    """
+
+    result: typing.List[str] = []
+
+    if executor is None:
+        todo = [path]
+        while todo:
+            folders, files = _scan_folder(todo.pop(), import_config)
+            todo.extend(folders)
+            result.extend(files)
+        return sorted(result)
+
+    pending = {executor.submit(_scan_folder, path, import_config)}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            folders, files = future.result()
+            result.extend(files)
+            for folder in folders:
+                pending.add(executor.submit(_scan_folder, folder, import_config))
+
+    return sorted(result)
+
+
+def hash_file(path: str) -> str:
+    """Return the sha256 hash of a file's content."""
+
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def get_manifest_path(
+    path: str,
+    import_config: FolderImportConfig,
+    reference_only: bool = False,
+    deduplicate: bool = False,
+) -> str:
+    """Return the path of the import manifest for a folder, import config and import mode.
+
+    All options that affect the created file models are part of the key, so a manifest is never used for an import
+    with different options.
+    """
+
+    key = json.dumps(
+        [
+            path,
+            import_config.include_files,
+            import_config.exclude_dirs,
+            reference_only,
+            deduplicate,
+        ],
+        sort_keys=True,
+    )
+    return os.path.join(
+        KIARA_MODULES_DEFAULT_IMPORT_MANIFESTS_FOLDER,
+        f"{hashlib.sha256(key.encode()).hexdigest()}.json",
+    )
+
+
+def load_manifest(path: str) -> typing.Dict[str, typing.Mapping[str, typing.Any]]:
+    """Load the manifest of a previous folder import, or return an empty one if there is none (or it's invalid)."""
+
+    if not os.path.isfile(path):
+        return {}
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except Exception as e:
+        log.warning(f"Ignoring invalid import manifest '{path}': {e}")
+        return {}
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest["files"]
+
+
+def save_manifest(
+    path: str, files: typing.Mapping[str, typing.Mapping[str, typing.Any]]
+) -> None:
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, f)
+    os.replace(temp_path, path)
+
+
+def create_file_reference(path: str) -> FileModel:
+    """Create a model for a file that references the file in place, without copying or hashing its content.
+
+    Only use this for files that won't change or disappear (see the 'source_is_immutable' config option).
+    """
+
+    abs_path = os.path.abspath(os.path.expanduser(path))
+    stat = os.stat(abs_path)
+    mime_type = mimetypes.guess_type(abs_path)[0]
+    file_name = os.path.basename(abs_path)
+
+    return FileModel(
+        orig_filename=file_name,
+        orig_path=abs_path,
+        import_time=datetime.now().isoformat(),
+        mime_type=mime_type if mime_type else "application/octet-stream",
+        size=stat.st_size,
+        file_name=file_name,
+    )
+
+
+def _import_file(
+    path: str,
+    previous: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+    reference_only: bool = False,
+) -> typing.Tuple[FileModel, typing.Optional[typing.Mapping[str, typing.Any]], bool]:
+    """Import a single file, reusing the file model of a previous import (from its manifest entry) if it didn't change.
+
+    Returns the file model, the new manifest entry (if a previous entry -- empty for new files -- was provided, or
+    'None' otherwise), and whether the file model of the previous import was reused. If 'reference_only' is set, the
+    file is referenced in place, and changes are only detected by size and modification time, without hashing.
+
+    Previous entries without a file model (files that were duplicates of another file in a deduplicated import) only
+    provide the content hash, the file is always imported again.
+    """
+
+    import_file = create_file_reference if reference_only else FileModel.import_file
+
+    if previous is None:
+        return (import_file(path), None, False)
+
+    stat = os.stat(path)
+    unchanged = (
+        previous.get("size") == stat.st_size
+        and previous.get("mtime") == stat.st_mtime_ns
+    )
+    has_file_model = "file_model" in previous.keys()
+    if unchanged and has_file_model:
+        return (FileModel(**previous["file_model"]), previous, True)
+
+    if reference_only:
+        file_hash = None
+    elif unchanged and previous.get("hash"):
+        file_hash = previous["hash"]
+    else:
+        file_hash = hash_file(path)
+    reused = (
+        has_file_model and file_hash is not None and previous.get("hash") == file_hash
+    )
+    if reused:
+        file_model = FileModel(**previous["file_model"])
+    else:
+        file_model = import_file(path)
+
+    entry = {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "hash": file_hash,
+        "file_model": json.loads(file_model.json()),
+    }
+    return (file_model, entry, reused)
+
+
+def _content_hash(
+    path: str, previous: typing.Optional[typing.Mapping[str, typing.Any]] = None
+) -> str:
+    """Return the content hash of a file, taken from its previous manifest entry if the file didn't change."""
+
+    if previous and previous.get("hash"):
+        stat = os.stat(path)
+        if (
+            previous.get("size") == stat.st_size
+            and previous.get("mtime") == stat.st_mtime_ns
+        ):
+            return previous["hash"]
+
+    return hash_file(path)
+
+
+def import_folder(
+    path: str,
+    import_config: FolderImportConfig,
+    workers: int = 1,
+    progress_interval: int = 0,
+    manifest_path: typing.Optional[str] = None,
+    reference_only: bool = False,
+    deduplicate: bool = False,
+) -> FileBundleModel:
+    """Import all included files in a folder into a file bundle, walking the folder and importing files in a thread pool.
+
+    The result is the same as the one of 'FileBundleModel.import_folder', but on file systems with high latency (e.g.
+    network mounts) the time to import a folder with many small files is much lower.
+
+    If a manifest path is provided, the size, modification time and content hash of every imported file is recorded
+    there, and files that did not change since the last import are not imported again.
+
+    If 'reference_only' is set, files are referenced in place instead of imported (see 'create_file_reference').
+
+    If 'deduplicate' is set, files are addressed by their content hash: only the first file with a given content is
+    imported, and the bundle entries of all other files with the same content share its data (their file models only
+    differ in the original file name and path). The manifest entries of those duplicates only record their own content hash, not the
+    shared file model, so they are matched against their own content in later imports.
+    """
+
+    abs_path = os.path.abspath(os.path.expanduser(path))
+
+    manifest: typing.Optional[typing.Dict[str, typing.Mapping[str, typing.Any]]] = None
+    if manifest_path is not None:
+        manifest = load_manifest(manifest_path)
+
+    def get_previous(file_path: str):
+        if manifest is None:
+            return None
+        return manifest.get(os.path.relpath(file_path, abs_path), {})
+
+    def import_file(file_path: str):
+        return _import_file(
+            file_path, get_previous(file_path), reference_only=reference_only
+        )
+
+    def content_hash(file_path: str):
+        return _content_hash(file_path, get_previous(file_path))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        file_paths = walk_folder(abs_path, import_config, executor=executor)
+
+        hashes: typing.Dict[str, str] = {}
+        duplicates: typing.Dict[str, str] = {}
+        if deduplicate:
+            first_paths: typing.Dict[str, str] = {}
+            for file_path, file_hash in zip(
+                file_paths, executor.map(content_hash, file_paths)
+            ):
+                hashes[file_path] = file_hash
+                if file_hash in first_paths.keys():
+                    duplicates[file_path] = first_paths[file_hash]
+                else:
+                    first_paths[file_hash] = file_path
+
+        to_import = [p for p in file_paths if p not in duplicates.keys()]
+        total = len(to_import)
+
+        file_models: typing.Dict[str, FileModel] = {}
+        new_manifest: typing.Dict[str, typing.Mapping[str, typing.Any]] = {}
+        reused = 0
+        start = time.time()
+        for index, (file_path, (file_model, entry, unchanged)) in enumerate(
+            zip(to_import, executor.map(import_file, to_import)),
+            start=1,
+        ):
+            file_models[file_path] = file_model
+            if entry is not None:
+                new_manifest[os.path.relpath(file_path, abs_path)] = entry
+            if unchanged:
+                reused = reused + 1
+
+            if progress_interval and (index % progress_interval == 0 or index == total):
+                duration = time.time() - start
+                log.info(
+                    f"Imported {index}/{total} files from '{abs_path}' ({index / duration if duration else 0:.0f} files/s)."
+                )
+
+    for file_path, first_path in duplicates.items():
+        file_name = os.path.basename(file_path)
+        file_model = file_models[first_path].copy(
+            update={
+                "orig_filename": file_name,
+                "orig_path": file_path,
+                "file_name": file_name,
+            }
+        )
+        file_models[file_path] = file_model
+        if manifest is not None:
+            stat = os.stat(file_path)
+            new_manifest[os.path.relpath(file_path, abs_path)] = {
+                "size": stat.st_size,
+                "mtime": stat.st_mtime_ns,
+                "hash": hashes[file_path],
+            }
+
+    if duplicates:
+        log.info(
+            f"Found {len(duplicates)} duplicate files in '{abs_path}', imported {total} files with unique content."
+        )
+
+    if manifest_path is not None:
+        log.info(
+            f"Reused {reused} unchanged files from previous import of '{abs_path}', imported {total - reused} new or changed files."
+        )
+        save_manifest(manifest_path, new_manifest)
+
+    included_files = {
+        os.path.relpath(file_path, abs_path): file_models[file_path]
+        for file_path in file_paths
+    }
+    return FileBundleModel(
+        included_files=included_files,
+        orig_path=abs_path,
+        orig_bundle_name=os.path.basename(abs_path),
+        import_time=datetime.now().isoformat(),
+        number_of_files=len(included_files),
+        size=sum(file_model.size for file_model in included_files.values()),
+    )
+
+
+def is_included_archive_member(name: str, import_config: FolderImportConfig) -> bool:
+    """Check whether an archive member (by its path within the archive) passes the include/exclude filters."""
+
+    parts = name.strip("/").split("/")
+    if import_config.exclude_dirs and any(
+        folder.endswith(d) for folder in parts[:-1] for d in import_config.exclude_dirs
+    ):
+        return False
+    if import_config.include_files and not any(
+        parts[-1].endswith(f) for f in import_config.include_files
+    ):
+        return False
+    return True
+
+
+def iter_archive_members(path: str) -> typing.Iterator[typing.Tuple[str, int]]:
+    """Iterate over the names and sizes of all regular files in a zip or tar (optionally compressed) archive.
+
+    Tar archives are streamed, so this only reads through the archive once and never seeks.
+    """
+
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if not info.is_dir():
+                    yield (info.filename, info.file_size)
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path, mode="r|*") as tf:
+            for member in tf:
+                if member.isfile():
+                    yield (member.name, member.size)
+    else:
+        raise KiaraProcessingException(
+            f"Can't import archive '{path}': not a zip or tar file."
+        )
+
+
+def split_archive_member_path(
+    path: str,
+) -> typing.Optional[typing.Tuple[str, str]]:
+    """Split the path of an archive member into the path of the archive, and the name of the member within it.
+
+    Returns 'None' if the path doesn't point to an archive member.
+    """
+
+    if ARCHIVE_MEMBER_SEPARATOR not in path:
+        return None
+    archive_path, member = path.split(ARCHIVE_MEMBER_SEPARATOR, 1)
+    if not os.path.isfile(archive_path):
+        return None
+    return (archive_path, member)
+
+
+def decode_stream(f: typing.IO[bytes], encoding: str = "utf-8") -> str:
+    """Read and decode a (non-seekable) binary stream chunk by chunk."""
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    parts = [
+        decoder.decode(chunk) for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b"")
+    ]
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def read_archive_text_contents(
+    path: str, members: typing.Iterable[str], encoding: str = "utf-8"
+) -> typing.Dict[str, str]:
+    """Read the text content of the specified members of an archive, decoding them while they are decompressed.
+
+    Tar archives are streamed, and read only once, regardless of the number of members.
+    """
+
+    todo = set(members)
+    result: typing.Dict[str, str] = {}
+
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for name in todo:
+                with zf.open(name) as f:
+                    result[name] = decode_stream(f, encoding=encoding)
+    else:
+        with tarfile.open(path, mode="r|*") as tf:
+            for member in tf:
+                if member.name not in todo:
+                    continue
+                member_file = tf.extractfile(member)
+                if member_file is None:
+                    continue
+                result[member.name] = decode_stream(member_file, encoding=encoding)
+                todo.remove(member.name)
+                if not todo:
+                    break
+
+    missing = todo - result.keys()
+    if missing:
+        raise KiaraProcessingException(
+            f"Can't read archive '{path}', missing member(s): {', '.join(sorted(missing))}"
+        )
+
+    return result
+
+
+def import_archive(path: str, import_config: FolderImportConfig) -> FileBundleModel:
+    """Create a file bundle from the files in an archive, without extracting it.
+
+    The file models of the bundle reference the archive members ('<archive_path>!/<member_name>'), their content can be
+    read with 'read_archive_text_contents'.
+    """
+
+    abs_path = os.path.abspath(os.path.expanduser(path))
+    import_time = datetime.now().isoformat()
+
+    included_files: typing.Dict[str, FileModel] = {}
+    for name, size in iter_archive_members(abs_path):
+        if not is_included_archive_member(name, import_config):
+            continue
+        file_name = os.path.basename(name)
+        mime_type = mimetypes.guess_type(file_name)[0]
+        included_files[name] = FileModel(
+            orig_filename=file_name,
+            orig_path=f"{abs_path}{ARCHIVE_MEMBER_SEPARATOR}{name}",
+            import_time=import_time,
+            mime_type=mime_type if mime_type else "application/octet-stream",
+            size=size,
+            file_name=file_name,
+        )
+
+    return FileBundleModel(
+        included_files=included_files,
+        orig_path=abs_path,
+        orig_bundle_name=os.path.basename(abs_path),
+        import_time=import_time,
+        number_of_files=len(included_files),
+        size=sum(file_model.size for file_model in included_files.values()),
+    )
 
 
 class ImportLocalPathConfig(KiaraModuleConfig):
 
     source_is_immutable: bool = Field(
-        description="Whether the data that lives in source path can be relied upon to not change, and always be available",
+        description="Whether the data that lives in source path can be relied upon to not change, and always be available. If set, files are referenced in place instead of copied and hashed.",
         default=False,
     )
 
 
+@instrumented
 class ImportLocalFileModule(KiaraModule):
     """Read a file into the data registry."""
 
@@ -44,13 +541,52 @@ class ImportLocalFileModule(KiaraModule):
     def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
 
         path = inputs.path
-        file_model = FileModel.import_file(path)
+        if self.get_config_value("source_is_immutable"):
+            file_model = create_file_reference(path)
+        else:
+            file_model = FileModel.import_file(path)
         outputs.file = file_model
 
 
+class ImportLocalFolderConfig(ImportLocalPathConfig):
+
+    workers: typing.Optional[int] = Field(
+        description="The number of threads to use to walk the folder and import its files in parallel. By default, the folder is imported serially.",
+        default=None,
+    )
+    progress_interval: int = Field(
+        description="Log the import progress every time this number of files was imported (parallel or incremental import only). Set to 0 to disable.",
+        default=10000,
+    )
+    deduplicate: bool = Field(
+        description="Whether to store files with identical content only once, shared by all file bundle entries with that content. Requires hashing every file.",
+        default=False,
+    )
+    incremental: bool = Field(
+        description="Whether to keep a manifest (size, modification time, content hash) of imported files, and only import files that are new or changed since the last import of the same folder.",
+        default=False,
+    )
+
+    @validator("workers")
+    def _validate_workers(cls, v):
+
+        if v is not None and v < 1:
+            raise ValueError("Value must be a positive integer.")
+        return v
+
+    @validator("progress_interval")
+    def _validate_progress_interval(cls, v):
+
+        if v < 0:
+            raise ValueError("Value must not be negative.")
+        return v
+
+
+@instrumented
 class ImportLocalFolderModule(KiaraModule):
+    """Import a folder (incl. sub-folders) into the data registry, as a file bundle."""
 
-    _config_cls = ImportLocalPathConfig
+    _config_cls = ImportLocalFolderConfig
 
     def create_input_schema(
         self,
@@ -95,6 +631,84 @@ class ImportLocalFolderModule(KiaraModule):
             include_files=included_files, exclude_dirs=excluded_dirs
         )
 
-        bundle = FileBundleModel.import_folder(source=path, import_config=import_config)
+        workers = self.get_config_value("workers")
+        incremental = self.get_config_value("incremental")
+        reference_only = self.get_config_value("source_is_immutable")
+        deduplicate = self.get_config_value("deduplicate")
+        if (
+            workers is None
+            and not incremental
+            and not reference_only
+            and not deduplicate
+        ):
+            bundle = FileBundleModel.import_folder(
+                source=path, import_config=import_config
+            )
+        else:
+            manifest_path = None
+            if incremental:
+                manifest_path = get_manifest_path(
+                    os.path.abspath(os.path.expanduser(path)),
+                    import_config,
+                    reference_only=reference_only,
+                    deduplicate=deduplicate,
+                )
+            bundle = import_folder(
+                path,
+                import_config=import_config,
+                workers=workers if workers else 1,
+                progress_interval=self.get_config_value("progress_interval"),
+                manifest_path=manifest_path,
+                reference_only=reference_only,
+                deduplicate=deduplicate,
+            )
 
         outputs.file_bundle = bundle
+
+
+@instrumented
+class ImportLocalArchiveModule(KiaraModule):
+    """Import the files in a (zip or tar) archive into the data registry, as a file bundle.
+
+    The archive is not extracted, bundle entries reference its members directly. Their content is decoded when it is
+    read (e.g. by the 'create_table_from_text_files' module), so the archive must not be moved or changed afterwards.
+    """
+
+    def create_input_schema(
+        self,
+    ) -> typing.Mapping[
+        str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
+    ]:
+        return {
+            "path": {"type": "string", "doc": "The path to the archive."},
+            "included_files": {
+                "type": "array",
+                "doc": "A list of strings, include all files where the filename ends with that string.",
+                "optional": True,
+            },
+            "excluded_dirs": {
+                "type": "array",
+                "doc": "A list of strings, exclude all folders whose name ends with that string.",
+                "optional": True,
+            },
+        }
+
+    def create_output_schema(
+        self,
+    ) -> typing.Mapping[
+        str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
+    ]:
+
+        return {
+            "file_bundle": {
+                "type": "file_bundle",
+                "doc": "The collection of files contained in the archive.",
+            }
+        }
+
+    def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
+
+        import_config = FolderImportConfig(
+            include_files=inputs.included_files, exclude_dirs=inputs.excluded_dirs
+        )
+        outputs.file_bundle = import_archive(inputs.path, import_config=import_config)
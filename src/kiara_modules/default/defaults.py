@@ -22,3 +22,19 @@ KIARA_MODULES_DEFAULT_RESOURCES_FOLDER = os.path.join(
 KIARA_MODULES_DEFAULT_PIPELINES_FOLDER = os.path.join(
     KIARA_MODULES_DEFAULT_RESOURCES_FOLDER, "pipelines"
 )
+"""Default folder for bundled pipeline descriptions."""
+
+KIARA_MODULES_DEFAULT_IMPORT_MANIFESTS_FOLDER = os.path.join(
+    kiara_modules_default_app_dirs.user_cache_dir, "import_manifests"
+)
+"""Folder for the manifests of previous (incremental) folder imports."""
+
+KIARA_MODULES_DEFAULT_PIPELINE_MANIFESTS_FOLDER = os.path.join(
+    kiara_modules_default_app_dirs.user_cache_dir, "pipeline_manifests"
+)
+"""Folder for the (generated) manifests of pipeline description folders."""
+
+KIARA_MODULES_DEFAULT_PROFILES_FOLDER = os.path.join(
+    kiara_modules_default_app_dirs.user_cache_dir, "profiles"
+)
+"""Default folder for the profiles of profiled modules."""
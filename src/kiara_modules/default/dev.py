@@ -2,14 +2,147 @@
 
 """Modules that are useful for kiara as well as pipeline-development, as well as testing."""
 
+import asyncio
+import tempfile
 import time
 import typing
-from pydantic import Field
+from pydantic import BaseModel, Field, validator
 
 from kiara import KiaraModule
 from kiara.config import KiaraModuleConfig
 from kiara.data.values import ValueSchema
+from kiara.exceptions import KiaraProcessingException
 from kiara.module import StepInputs, StepOutputs
+from kiara_modules.default.instrumentation import instrumented
+
+if typing.TYPE_CHECKING:
+    import pyarrow as pa
+
+
+def _check_size(name: str, value: int) -> None:
+
+    if value < 1:
+        raise KiaraProcessingException(
+            f"Can't create synthetic data: '{name}' must be a positive integer, not {value}."
+        )
+
+
+def create_synthetic_array(rows: int, seed: int = 0) -> "pa.Array":
+    """Create an array of random integers."""
+
+    _check_size("rows", rows)
+
+    import numpy as np
+    import pyarrow as pa
+
+    rng = np.random.default_rng(seed)
+    return pa.array(rng.integers(0, rows, size=rows))
+
+
+def create_synthetic_table(rows: int, columns: int, seed: int = 0) -> "pa.Table":
+    """Create a table of random values, with integer, float and string columns (in turn)."""
+
+    _check_size("rows", rows)
+    _check_size("columns", columns)
+
+    import numpy as np
+    import pyarrow as pa
+
+    rng = np.random.default_rng(seed)
+    arrays = []
+    names = []
+    for index in range(columns):
+        kind = index % 3
+        if kind == 0:
+            arrays.append(pa.array(rng.integers(0, rows, size=rows)))
+        elif kind == 1:
+            arrays.append(pa.array(rng.random(size=rows)))
+        else:
+            arrays.append(
+                pa.array(rng.integers(0, rows, size=rows).astype(str)).cast(pa.string())
+            )
+        names.append(f"column_{index}")
+
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def create_synthetic_graph(nodes: int, edges: int, seed: int = 0) -> typing.Any:
+    """Create a random, directed (networkx) graph."""
+
+    _check_size("nodes", nodes)
+    if edges < 0:
+        raise KiaraProcessingException(
+            f"Can't create synthetic data: 'edges' must not be negative, not {edges}."
+        )
+
+    import networkx as nx
+
+    return nx.gnm_random_graph(nodes, edges, seed=seed, directed=True)
+
+
+class SyntheticDataConfig(BaseModel):
+    """The size of a generated (synthetic) dummy output value."""
+
+    rows: int = Field(
+        description="The number of rows (for tables), items (for arrays and lists) or characters (for strings).",
+        default=1000,
+    )
+    columns: int = Field(description="The number of table columns.", default=5)
+    nodes: int = Field(description="The number of graph nodes.", default=100)
+    edges: int = Field(description="The number of graph edges.", default=1000)
+    seed: int = Field(description="The seed for the random values.", default=0)
+
+    @validator("rows", "columns", "nodes")
+    def _validate_size(cls, v):
+
+        if v < 1:
+            raise ValueError("Value must be a positive integer.")
+        return v
+
+    @validator("edges")
+    def _validate_edges(cls, v):
+
+        if v < 0:
+            raise ValueError("Value must not be negative.")
+        return v
+
+
+def create_synthetic_value(value_type: str, config: SyntheticDataConfig) -> typing.Any:
+    """Create a synthetic value for a value type.
+
+    Raises a 'KiaraProcessingException' if values of the type can't be generated.
+    """
+
+    if value_type == "table":
+        return create_synthetic_table(config.rows, config.columns, seed=config.seed)
+    elif value_type == "array":
+        return create_synthetic_array(config.rows, seed=config.seed)
+    elif value_type == "network_graph":
+        return create_synthetic_graph(config.nodes, config.edges, seed=config.seed)
+    elif value_type == "list":
+        return create_synthetic_array(config.rows, seed=config.seed).to_pylist()
+    elif value_type == "dict":
+        return {
+            f"key_{index}": value
+            for index, value in enumerate(
+                create_synthetic_array(config.rows, seed=config.seed).to_pylist()
+            )
+        }
+    elif value_type == "string":
+        return "x" * config.rows
+    elif value_type == "integer":
+        return config.rows
+    elif value_type == "float":
+        return float(config.rows)
+    elif value_type == "boolean":
+        return config.seed % 2 == 0
+
+    raise KiaraProcessingException(
+        f"Can't create synthetic value of type: {value_type}"
+    )
+
+
+IO_CHUNK_SIZE = 1024 * 1024
 
 
 class DummyProcessingModuleConfig(KiaraModuleConfig):
@@ -30,10 +163,31 @@ class DummyProcessingModuleConfig(KiaraModuleConfig):
         description="The delay in seconds from processing start to when the (dummy) outputs are returned.",
         default=0,
     )
+    synthetic_outputs: typing.Mapping[str, SyntheticDataConfig] = Field(
+        description="The size of generated outputs, for outputs that don't have a value in 'outputs'. Outputs without an entry here are generated with the default size.",
+        default_factory=dict,
+    )
+    cpu_time: float = Field(
+        description="The CPU time in seconds to burn while processing.", default=0
+    )
+    memory: int = Field(
+        description="The amount of memory in bytes to allocate while processing.",
+        default=0,
+    )
+    io_bytes: int = Field(
+        description="The number of bytes to write to (and read back from) a temporary file while processing.",
+        default=0,
+    )
 
 
+@instrumented
 class DummyModule(KiaraModule):
-    """Module that simulates processing, but uses hard-coded outputs as a result."""
+    """Module that simulates processing, but uses hard-coded or generated outputs as a result.
+
+    Outputs that don't have a hard-coded value are generated (as synthetic data of a configurable size), according to
+    the type in the output schema. Processing can also simulate load, by burning CPU time, allocating memory and
+    writing/reading a temporary file.
+    """
 
     _config_cls = DummyProcessingModuleConfig
 
@@ -58,21 +212,73 @@ class DummyModule(KiaraModule):
         return result
 
     def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
-        """Returns the hardcoded output values that are set in the ``outputs`` config field.
+        """Returns the hardcoded output values that are set in the ``outputs`` config field, and generates synthetic values for all other outputs.
 
-        Optionally, this module can simulate processing by waiting a configured amount of time (seconds -- specified in the ``delay`` config parameter).
+        The synthetic values are sized according to the ``synthetic_outputs`` config field. Before the outputs are set,
+        this module waits for the configured ``delay`` (in seconds), and simulates load by burning ``cpu_time``,
+        allocating ``memory`` and writing/reading ``io_bytes`` to/from a temporary file.
         """
 
         time.sleep(self.config.get("delay"))  # type: ignore
 
+        self.simulate_load()
+        self.set_dummy_outputs(outputs)
+
+    async def process_async(self, inputs: StepInputs, outputs: StepOutputs) -> None:
+        """Same as ``process``, but waits for the configured delay without blocking the event loop.
+
+        This allows an asynchronous runner to overlap independent (dummy) steps.
+        """
+
+        await asyncio.sleep(self.config.get("delay"))  # type: ignore
+
+        await asyncio.get_running_loop().run_in_executor(None, self.simulate_load)
+        self.set_dummy_outputs(outputs)
+
+    def simulate_load(self) -> None:
+        """Burn CPU time, allocate memory and write/read a temporary file, as configured."""
+
+        memory: int = self.get_config_value("memory")
+        ballast = b"\x01" * memory
+
+        io_bytes: int = self.get_config_value("io_bytes")
+        if io_bytes:
+            chunk = b"\x01" * min(io_bytes, IO_CHUNK_SIZE)
+            with tempfile.TemporaryFile() as f:
+                written = 0
+                while written < io_bytes:
+                    written += f.write(chunk[: io_bytes - written])
+                f.flush()
+                f.seek(0)
+                while f.read(IO_CHUNK_SIZE):
+                    pass
+
+        cpu_time: float = self.get_config_value("cpu_time")
+        if cpu_time:
+            # the CPU time of this thread only, so concurrent dummy steps each burn the configured time
+            end = time.thread_time() + cpu_time
+            value = 0
+            while time.thread_time() < end:
+                for i in range(10000):
+                    value = (value + i * i) % 1000003
+
+        del ballast
+
+    def set_dummy_outputs(self, outputs: StepOutputs) -> None:
+
         output_values: typing.Mapping = self.config.get("outputs")  # type: ignore
+        output_schema: typing.Mapping = self.config.get("output_schema")  # type: ignore
+        synthetic_outputs: typing.Mapping[str, SyntheticDataConfig] = self.config.get("synthetic_outputs")  # type: ignore
 
         value_dict = {}
         for output_name in self.output_names:
             if output_name not in output_values.keys():
-                raise NotImplementedError()
-                # v = self.output_schemas[output_name].type_obj.fake_value()
-                # value_dict[output_name] = v
+                synthetic_config = synthetic_outputs.get(
+                    output_name, SyntheticDataConfig()
+                )
+                value_dict[output_name] = create_synthetic_value(
+                    output_schema[output_name]["type"], synthetic_config
+                )
             else:
                 value_dict[output_name] = output_values[output_name]
         outputs.set_values(**value_dict)
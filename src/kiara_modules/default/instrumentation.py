@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+
+"""Performance instrumentation for the modules in this package.
+
+Every module class decorated with [instrumented][kiara_modules.default.instrumentation.instrumented] records the wall
+time, CPU time, Arrow memory pool usage and the number of rows/bytes of its inputs and outputs for every ``process`` call,
+and hands the resulting [ProcessMetrics][kiara_modules.default.instrumentation.ProcessMetrics] to all registered sinks.
+If no sink is registered (the default), ``process`` is called directly, nothing is measured.
+
+Sinks can be registered with [add_sink][kiara_modules.default.instrumentation.add_sink], or via the
+``KIARA_MODULES_INSTRUMENTATION`` environment variable, which contains a comma-separated list of sink specs:
+
+- ``log``: log the metrics of every call (to the 'kiara_modules' logger)
+- ``jsonl:<path>``: append the metrics of every call to a JSON lines file
+"""
+
+import functools
+import os
+import sys
+import threading
+import time
+import typing
+from abc import ABC, abstractmethod
+from pydantic import BaseModel, Field
+
+from kiara_modules.default import log
+from kiara_modules.default.memoization import (
+    get_memoization_cache,
+    is_memoized,
+    memoized_process,
+)
+from kiara_modules.default.profiling import (
+    get_profile_settings,
+    is_profiled,
+    profile_process,
+)
+
+INSTRUMENTATION_ENV_VAR = "KIARA_MODULES_INSTRUMENTATION"
+
+
+class ProcessMetrics(BaseModel):
+    """The metrics recorded for a single ``process`` call of a module."""
+
+    module_type: str = Field(description="The type name of the module.")
+    module_id: str = Field(
+        description="The id of the module (the step id, if it runs in a pipeline)."
+    )
+    started: float = Field(
+        description="The start time of the call (seconds since the epoch)."
+    )
+    wall_time: float = Field(description="The wall time of the call, in seconds.")
+    cpu_time: float = Field(
+        description="The CPU time of the process (all threads) during the call, in seconds."
+    )
+    arrow_peak_bytes: typing.Optional[int] = Field(
+        description="The peak memory allocated from the Arrow memory pool during the call (if pyarrow is loaded), in bytes.",
+        default=None,
+    )
+    rows_in: int = Field(
+        description="The number of rows/items of all (tabular or array) inputs.",
+        default=0,
+    )
+    bytes_in: int = Field(
+        description="The size of all inputs (where known), in bytes.", default=0
+    )
+    rows_out: int = Field(
+        description="The number of rows/items of all (tabular or array) outputs.",
+        default=0,
+    )
+    bytes_out: int = Field(
+        description="The size of all outputs (where known), in bytes.", default=0
+    )
+    error: typing.Optional[str] = Field(
+        description="The error, if the call failed.", default=None
+    )
+
+
+class MetricsSink(ABC):
+    """Base class for receivers of process metrics."""
+
+    @abstractmethod
+    def record(self, metrics: ProcessMetrics) -> None:
+        """Record the metrics of a single call."""
+
+
+class LogSink(MetricsSink):
+    """Log the metrics of every call."""
+
+    def record(self, metrics: ProcessMetrics) -> None:
+
+        log.info(
+            f"Processed '{metrics.module_id}' ({metrics.module_type}): wall {metrics.wall_time:.4f}s, cpu {metrics.cpu_time:.4f}s, arrow peak {metrics.arrow_peak_bytes} bytes, in {metrics.rows_in} rows/{metrics.bytes_in} bytes, out {metrics.rows_out} rows/{metrics.bytes_out} bytes"
+            + (f", error: {metrics.error}" if metrics.error else "")
+        )
+
+
+class JsonLinesSink(MetricsSink):
+    """Append the metrics of every call to a JSON lines file."""
+
+    def __init__(self, path: str):
+
+        self._path: str = os.path.abspath(os.path.expanduser(path))
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def record(self, metrics: ProcessMetrics) -> None:
+
+        line = metrics.json() + "\n"
+        with self._lock:
+            with open(self._path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+
+class MemorySink(MetricsSink):
+    """Collect the metrics of every call in memory."""
+
+    def __init__(self):
+
+        self._records: typing.List[ProcessMetrics] = []
+        self._lock = threading.Lock()
+
+    @property
+    def records(self) -> typing.List[ProcessMetrics]:
+
+        with self._lock:
+            return list(self._records)
+
+    def record(self, metrics: ProcessMetrics) -> None:
+
+        with self._lock:
+            self._records.append(metrics)
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._records.clear()
+
+
+_SINKS: typing.List[MetricsSink] = []
+
+
+def add_sink(sink: MetricsSink) -> MetricsSink:
+    """Register a sink, which enables instrumentation."""
+
+    _SINKS.append(sink)
+    return sink
+
+
+def remove_sink(sink: MetricsSink) -> None:
+    """Remove a registered sink (instrumentation is disabled once no sinks are left)."""
+
+    if sink in _SINKS:
+        _SINKS.remove(sink)
+
+
+def get_sinks() -> typing.List[MetricsSink]:
+
+    return list(_SINKS)
+
+
+def create_sink(spec: str) -> MetricsSink:
+    """Create a sink from a spec string ('log', or 'jsonl:<path>')."""
+
+    if spec == "log":
+        return LogSink()
+    elif spec.startswith("jsonl:") and spec[6:]:
+        return JsonLinesSink(spec[6:])
+    else:
+        raise ValueError(f"Invalid instrumentation sink spec: {spec}")
+
+
+def _get_data_size(data: typing.Any) -> typing.Tuple[int, int]:
+
+    if data is None:
+        return 0, 0
+
+    if hasattr(data, "num_rows"):
+        rows = data.num_rows
+    elif hasattr(data, "nbytes") and hasattr(data, "__len__"):
+        rows = len(data)
+    else:
+        rows = 0
+
+    size: typing.Any
+    if isinstance(data, (str, bytes)):
+        size = len(data)
+    else:
+        size = getattr(data, "nbytes", None)
+        if size is None:
+            size = getattr(data, "size", 0)
+    if not isinstance(size, int):
+        size = 0
+
+    return rows, size
+
+
+def _get_value_set_size(value_set: typing.Any) -> typing.Tuple[int, int]:
+
+    rows = 0
+    size = 0
+    try:
+        for field_name in value_set.get_all_field_names():
+            value = value_set.get_value_obj(field_name)
+            if not value.is_set:
+                continue
+            _rows, _size = _get_data_size(value.get_value_data())
+            rows += _rows
+            size += _size
+    except Exception as e:
+        log.debug(f"Can't determine size of values: {e}")
+
+    return rows, size
+
+
+def _measure_process(
+    module: typing.Any,
+    process: typing.Callable[..., None],
+    inputs: typing.Any,
+    outputs: typing.Any,
+    **kwargs: typing.Any,
+) -> None:
+
+    pool = None
+    if "pyarrow" in sys.modules.keys():
+        pool = sys.modules["pyarrow"].default_memory_pool()  # type: ignore
+        arrow_before = pool.bytes_allocated()
+        arrow_max_before = pool.max_memory()
+
+    error: typing.Optional[str] = None
+    started = time.time()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        process(module, inputs, outputs, **kwargs)
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        cpu_time = time.process_time() - cpu_start
+        wall_time = time.perf_counter() - wall_start
+
+        arrow_peak_bytes = None
+        if pool is None and "pyarrow" in sys.modules.keys():
+            # pyarrow was only loaded during this call, so everything it allocated was allocated during the call
+            pool = sys.modules["pyarrow"].default_memory_pool()  # type: ignore
+            arrow_before = 0
+            arrow_max_before = 0
+        if pool is not None:
+            # the Arrow pool only tracks its all-time peak, so this is only accurate if the peak was reached during this call
+            arrow_peak_bytes = max(
+                pool.max_memory() - arrow_max_before,
+                pool.bytes_allocated() - arrow_before,
+                0,
+            )
+
+        rows_in, bytes_in = _get_value_set_size(inputs)
+        rows_out, bytes_out = _get_value_set_size(outputs) if error is None else (0, 0)
+
+        metrics = ProcessMetrics(
+            module_type=str(
+                getattr(module, "_module_type_name", module.__class__.__name__)
+            ),
+            module_id=str(getattr(module, "id", "")),
+            started=started,
+            wall_time=wall_time,
+            cpu_time=cpu_time,
+            arrow_peak_bytes=arrow_peak_bytes,
+            rows_in=rows_in,
+            bytes_in=bytes_in,
+            rows_out=rows_out,
+            bytes_out=bytes_out,
+            error=error,
+        )
+        for sink in list(_SINKS):
+            try:
+                sink.record(metrics)
+            except Exception as e:
+                log.warning(f"Can't record process metrics in sink '{sink}': {e}")
+
+
+def _get_process(
+    module: typing.Any, process: typing.Callable[..., None]
+) -> typing.Callable[..., None]:
+    """Return a 'process' function of a module, wrapped for profiling and memoization if those are enabled for it.
+
+    The wrapped function is cached on the module instance, and only re-created after profiling or memoization were
+    re-configured.
+    """
+
+    settings = (get_profile_settings(), get_memoization_cache())
+
+    processes = module.__dict__.setdefault("_instrumented_processes", {})
+    cached = processes.get(process, None)
+    if cached is not None and cached[0] is settings[0] and cached[1] is settings[1]:
+        return cached[2]
+
+    _process = process
+    if is_profiled(module):
+        _process = functools.partial(profile_process, _process)
+    if is_memoized(module):
+        _process = functools.partial(memoized_process, _process)
+
+    processes[process] = (settings[0], settings[1], _process)
+    return _process
+
+
+def instrumented(cls: typing.Type) -> typing.Type:
+    """Class decorator that instruments (and, if enabled, profiles and memoizes) the ``process`` method of a module class.
+
+    Profiling and memoization are described in [kiara_modules.default.profiling][] and
+    [kiara_modules.default.memoization][]. Subclasses that don't override ``process`` inherit the instrumented version of their base class.
+    """
+
+    process = cls.__dict__.get("process", None)
+    if process is None or getattr(process, "_instrumented", False):
+        return cls
+
+    @functools.wraps(process)
+    def instrumented_process(
+        self, inputs: typing.Any, outputs: typing.Any, **kwargs: typing.Any
+    ) -> None:
+
+        _process = _get_process(self, process)
+        if not _SINKS:
+            return _process(self, inputs, outputs, **kwargs)
+        return _measure_process(self, _process, inputs, outputs, **kwargs)
+
+    instrumented_process._instrumented = True  # type: ignore
+    cls.process = instrumented_process
+    return cls
+
+
+for _spec in os.environ.get(INSTRUMENTATION_ENV_VAR, "").split(","):
+    if _spec.strip():
+        try:
+            add_sink(create_sink(_spec.strip()))
+        except Exception as e:
+            log.warning(f"Ignoring sink in '{INSTRUMENTATION_ENV_VAR}': {e}")
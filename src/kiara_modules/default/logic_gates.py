@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import time
 import typing
+from abc import abstractmethod
 from pydantic import Field
 
 from kiara.config import KiaraModuleConfig
 from kiara.data.values import ValueSchema
 from kiara.module import KiaraModule, StepInputs, StepOutputs
+from kiara_modules.default.instrumentation import instrumented
 
 
 class LogicProcessingModuleConfig(KiaraModuleConfig):
@@ -15,12 +18,89 @@ class LogicProcessingModuleConfig(KiaraModuleConfig):
         default=0,
         description="the delay in seconds from processing start to when the output is returned.",
     )
+    array_mode: bool = Field(
+        default=False,
+        description="Whether the inputs and output are declared as (boolean) arrays, instead of single booleans.",
+    )
+
+
+def is_array(value: typing.Any) -> bool:
+    """Check whether a value is an Arrow array (chunked or not)."""
+
+    import pyarrow as pa
+
+    return isinstance(value, (pa.Array, pa.ChunkedArray))
+
+
+def as_kernel_argument(value: typing.Any) -> typing.Any:
+    """Wrap single (Python) booleans into Arrow scalars, so they can be combined with arrays in Arrow kernels."""
+
+    import pyarrow as pa
+
+    if is_array(value) or isinstance(value, pa.Scalar):
+        return value
+    return pa.scalar(value, type=pa.bool_())
 
 
+@instrumented
 class LogicProcessingModule(KiaraModule):
+    """Base class for all the 'logic'-related modules.
+
+    Every logic module also accepts boolean arrays (instead of single booleans) as inputs, in which case the whole arrays
+    are evaluated with Arrow kernels. Null values are handled with Kleene logic ('False and null' is 'False',
+    'True or null' is 'True', everything else involving null is null). Modules that are used with arrays should have
+    'array_mode' enabled, so their inputs and output are declared as arrays; the bundled 'nand', 'nor' and 'xor'
+    pipelines have '*_array' variants ('nand_array', ...) that do that for all their steps.
+
+    Logic modules are pure: their ``evaluate`` method computes the output directly from the inputs, which is used to fuse
+    pipelines of logic modules (see [kiara_modules.default.pipeline_fusion][]).
+
+    Processing can simulate a delay, either blocking (``process``), or non-blocking (``process_async``, which can be
+    awaited and overlapped with other steps by an asynchronous runner).
+    """
 
     _config_cls = LogicProcessingModuleConfig
 
+    @classmethod
+    def is_pure(cls) -> bool:
+        """Check whether this module type is pure (has no side effects, and can be evaluated directly)."""
+        return True
+
+    def get_value_type(self) -> str:
+        """The type of the input and output values, depending on whether the module is in array mode."""
+
+        if self.get_config_value("array_mode"):
+            return "array"
+        else:
+            return "boolean"
+
+    @abstractmethod
+    def evaluate(self, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        """Compute the output value from the input values."""
+
+    def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
+
+        time.sleep(self.config.get("delay"))  # type: ignore
+
+        outputs.y = self.evaluate(
+            **{
+                input_name: getattr(inputs, input_name)
+                for input_name in self.input_names
+            }
+        )
+
+    async def process_async(self, inputs: StepInputs, outputs: StepOutputs) -> None:
+        """Same as ``process``, but waits for the configured delay without blocking the event loop."""
+
+        await asyncio.sleep(self.config.get("delay"))  # type: ignore
+
+        outputs.y = self.evaluate(
+            **{
+                input_name: getattr(inputs, input_name)
+                for input_name in self.input_names
+            }
+        )
+
 
 class NotModule(LogicProcessingModule):
     """Negates the input."""
@@ -33,7 +113,10 @@ class NotModule(LogicProcessingModule):
         """The not module only has one input, a boolean that will be negated by the module."""
 
         return {
-            "a": {"type": "boolean", "doc": "A boolean describing this input state."}
+            "a": {
+                "type": self.get_value_type(),
+                "doc": "A boolean describing this input state.",
+            }
         }
 
     def create_output_schema(
@@ -41,22 +124,23 @@ class NotModule(LogicProcessingModule):
     ) -> typing.Mapping[
         str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
     ]:
-
         """The output of this module is a single boolean, the negated input."""
 
         return {
             "y": {
-                "type": "boolean",
+                "type": self.get_value_type(),
                 "doc": "A boolean describing the module output state.",
             }
         }
 
-    def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
+    def evaluate(self, a: typing.Any) -> typing.Any:
         """Negates the input boolean."""
 
-        time.sleep(self.config.get("delay"))  # type: ignore
+        import pyarrow.compute as pc
 
-        outputs.y = not inputs.a
+        if is_array(a):
+            return pc.invert(a)
+        return not a
 
 
 class AndModule(LogicProcessingModule):
@@ -69,8 +153,14 @@ class AndModule(LogicProcessingModule):
     ]:
 
         return {
-            "a": {"type": "boolean", "doc": "A boolean describing this input state."},
-            "b": {"type": "boolean", "doc": "A boolean describing this input state."},
+            "a": {
+                "type": self.get_value_type(),
+                "doc": "A boolean describing this input state.",
+            },
+            "b": {
+                "type": self.get_value_type(),
+                "doc": "A boolean describing this input state.",
+            },
         }
 
     def create_output_schema(
@@ -81,16 +171,18 @@ class AndModule(LogicProcessingModule):
 
         return {
             "y": {
-                "type": "boolean",
+                "type": self.get_value_type(),
                 "doc": "A boolean describing the module output state.",
             }
         }
 
-    def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
+    def evaluate(self, a: typing.Any, b: typing.Any) -> typing.Any:
 
-        time.sleep(self.config.delay)  # type: ignore
+        import pyarrow.compute as pc
 
-        outputs.y = inputs.a and inputs.b
+        if is_array(a) or is_array(b):
+            return pc.and_kleene(as_kernel_argument(a), as_kernel_argument(b))
+        return a and b
 
 
 class OrModule(LogicProcessingModule):
@@ -103,8 +195,14 @@ class OrModule(LogicProcessingModule):
     ]:
 
         return {
-            "a": {"type": "boolean", "doc": "A boolean describing this input state."},
-            "b": {"type": "boolean", "doc": "A boolean describing this input state."},
+            "a": {
+                "type": self.get_value_type(),
+                "doc": "A boolean describing this input state.",
+            },
+            "b": {
+                "type": self.get_value_type(),
+                "doc": "A boolean describing this input state.",
+            },
         }
 
     def create_output_schema(
@@ -115,12 +213,15 @@ class OrModule(LogicProcessingModule):
 
         return {
             "y": {
-                "type": "boolean",
+                "type": self.get_value_type(),
                 "doc": "A boolean describing the module output state.",
             }
         }
 
-    def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
+    def evaluate(self, a: typing.Any, b: typing.Any) -> typing.Any:
 
-        time.sleep(self.config.get("delay"))  # type: ignore
-        outputs.y = inputs.a or inputs.b
+        import pyarrow.compute as pc
+
+        if is_array(a) or is_array(b):
+            return pc.or_kleene(as_kernel_argument(a), as_kernel_argument(b))
+        return a or b
@@ -0,0 +1,534 @@
+# -*- coding: utf-8 -*-
+
+"""Opt-in result memoization for deterministic modules.
+
+Module classes that have an ``is_deterministic`` class method that returns 'True' compute their outputs only from their
+inputs and config. If memoization is enabled, their outputs are cached, keyed by the module type, the module config and
+hashes of the input values, and re-used when the module is processed with the same config and inputs again.
+
+Results are kept in memory, and optionally also in a folder on disk (so they can be re-used across processes). Both
+tiers are limited in size (in bytes), the least recently used results are evicted first. Input values of types that
+can't be hashed (anything other than Arrow tables/arrays, network graphs, files and plain Python values) disable
+memoization for that call. Files (and file bundles) are hashed by the paths, sizes and modification times of their
+files, not by their content.
+
+Arrow values and immutable Python values are kept in the memory tier as they are, all other values (lists, dicts,
+network graphs, ...) are kept in pickled form, so every cache hit returns a new copy that can't change the cached
+result.
+
+Memoization is enabled with [enable_memoization][kiara_modules.default.memoization.enable_memoization], or by setting
+the ``KIARA_MODULES_MEMOIZE`` environment variable (to the maximum size of the memory tier, in bytes, or to 'true' for
+the default size). ``KIARA_MODULES_MEMOIZE_DIR`` (and ``KIARA_MODULES_MEMOIZE_MAX_DISK_BYTES``) enable the disk tier. Hit
+rates are available via [get_memoization_stats][kiara_modules.default.memoization.get_memoization_stats], and are
+logged on exit if memoization was enabled via environment variable.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import pickle
+import threading
+import typing
+from collections import OrderedDict
+
+from kiara_modules.default import log
+
+if typing.TYPE_CHECKING:
+    import pyarrow as pa
+
+MEMOIZE_ENV_VAR = "KIARA_MODULES_MEMOIZE"
+MEMOIZE_DIR_ENV_VAR = "KIARA_MODULES_MEMOIZE_DIR"
+MEMOIZE_MAX_DISK_BYTES_ENV_VAR = "KIARA_MODULES_MEMOIZE_MAX_DISK_BYTES"
+
+DEFAULT_MAX_MEMORY_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_DISK_BYTES = 4 * 1024 * 1024 * 1024
+
+_NOT_CACHED = object()
+
+
+class UnhashableValueException(Exception):
+    pass
+
+
+def is_deterministic(module: typing.Any) -> bool:
+    """Check whether a module is declared deterministic (its outputs only depend on its inputs and config)."""
+
+    _is_deterministic = getattr(module, "is_deterministic", None)
+    return callable(_is_deterministic) and _is_deterministic() is True
+
+
+def _update_array_hash(h: typing.Any, array: "pa.Array") -> None:
+    """Hash the type, position and buffers of an array in place (including the buffers of child arrays)."""
+
+    import pyarrow as pa
+
+    h.update(f"{array.type}:{array.offset}:{len(array)}:".encode("utf-8"))
+    if pa.types.is_dictionary(array.type):
+        _update_array_hash(h, array.indices)
+        _update_array_hash(h, array.dictionary)
+        return
+
+    for buffer in array.buffers():
+        if buffer is None:
+            h.update(b"-")
+        else:
+            h.update(f"{buffer.size}:".encode("utf-8"))
+            h.update(buffer)
+
+
+def _get_file_mtime(file_model: typing.Any) -> typing.Optional[int]:
+    """Return the modification time of the original file of a file model (or of the archive it's a member of).
+
+    Falls back to the imported file, if the original file doesn't exist anymore.
+    """
+
+    from kiara_modules.default.data_onboarding import split_archive_member_path
+
+    archive_member = split_archive_member_path(file_model.orig_path)
+    if archive_member is not None:
+        paths = [archive_member[0]]
+    else:
+        paths = [file_model.orig_path, file_model.path]
+
+    for path in paths:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+    return None
+
+
+def _update_hash(h: typing.Any, data: typing.Any) -> None:
+
+    if data is None or isinstance(data, (str, int, float, bool, list, dict, tuple)):
+        try:
+            h.update(b"json:")
+            h.update(json.dumps(data, sort_keys=True).encode("utf-8"))
+            return
+        except TypeError:
+            raise UnhashableValueException(f"Can't hash value: {data}")
+
+    type_name = f"{type(data).__module__}.{type(data).__name__}"
+    h.update(f"{type_name}:".encode("utf-8"))
+
+    if type_name.startswith("pyarrow."):
+        import pyarrow as pa
+
+        # hash the buffers in place, without serializing (copying) the data
+        if isinstance(data, pa.Array):
+            _update_array_hash(h, data)
+            return
+        if isinstance(data, pa.ChunkedArray):
+            h.update(f"{data.type}:".encode("utf-8"))
+            for chunk in data.chunks:
+                _update_array_hash(h, chunk)
+            return
+        if isinstance(data, pa.Table):
+            h.update(data.schema.serialize())
+            for column in data.columns:
+                for chunk in column.chunks:
+                    _update_array_hash(h, chunk)
+            return
+
+    elif type_name.startswith("networkx."):
+        import networkx as nx
+
+        h.update(
+            json.dumps(nx.node_link_data(data), sort_keys=True, default=str).encode(
+                "utf-8"
+            )
+        )
+        return
+
+    elif hasattr(data, "included_files") or (
+        hasattr(data, "path") and hasattr(data, "orig_filename")
+    ):
+        # an imported file (or a file bundle), hash the paths, sizes and modification times of its files, but not
+        # their content or any metadata that changes with every import of the same file (like the import time)
+        files = getattr(data, "included_files", {"": data})
+        for rel_path in sorted(files.keys()):
+            file_model = files[rel_path]
+            h.update(
+                json.dumps(
+                    [
+                        rel_path,
+                        file_model.orig_path,
+                        file_model.size,
+                        _get_file_mtime(file_model),
+                    ]
+                ).encode("utf-8")
+            )
+        return
+
+    raise UnhashableValueException(f"Can't hash value of type: {type_name}")
+
+
+def get_cache_key(module: typing.Any, inputs: typing.Any) -> str:
+    """Calculate the cache key for processing a module with a set of inputs.
+
+    Raises an 'UnhashableValueException' if any of the inputs can't be hashed.
+    """
+
+    h = hashlib.sha256()
+    module_type = getattr(module, "_module_type_name", module.__class__.__name__)
+    h.update(f"{module_type}\n".encode("utf-8"))
+
+    config = getattr(module, "config", None)
+    if config is not None:
+        h.update(json.dumps(config.dict(), sort_keys=True, default=str).encode("utf-8"))
+
+    for field_name in sorted(inputs.get_all_field_names()):
+        h.update(f"\n{field_name}=".encode("utf-8"))
+        value = inputs.get_value_obj(field_name)
+        _update_hash(h, value.get_value_data() if value.is_set else None)
+
+    return h.hexdigest()
+
+
+def _get_data_size(data: typing.Any) -> int:
+
+    size = getattr(data, "nbytes", None)
+    if isinstance(size, int):
+        return size
+    return len(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+IMMUTABLE_TYPES = (type(None), str, bytes, int, float, bool)
+
+
+def _is_immutable(data: typing.Any) -> bool:
+
+    return isinstance(data, IMMUTABLE_TYPES) or type(data).__module__.startswith(
+        "pyarrow"
+    )
+
+
+class PickledValue(object):
+    """A mutable value, kept in pickled form in the memory tier of the result cache."""
+
+    def __init__(self, data: bytes):
+
+        self.data: bytes = data
+
+
+def _freeze_result(
+    result: typing.Mapping[str, typing.Any],
+) -> typing.Tuple[typing.Dict[str, typing.Any], int]:
+    """Prepare a result for the memory tier (pickle all mutable values), and return it with its size."""
+
+    frozen: typing.Dict[str, typing.Any] = {}
+    size = 0
+    for field_name, value in result.items():
+        if _is_immutable(value):
+            frozen[field_name] = value
+            size += _get_data_size(value)
+        else:
+            frozen[field_name] = PickledValue(
+                pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            )
+            size += len(frozen[field_name].data)
+    return frozen, size
+
+
+def _thaw_result(
+    frozen: typing.Mapping[str, typing.Any],
+) -> typing.Dict[str, typing.Any]:
+    """Restore a result from the memory tier, with new copies of all mutable values."""
+
+    return {
+        field_name: (
+            pickle.loads(value.data) if isinstance(value, PickledValue) else value
+        )
+        for field_name, value in frozen.items()
+    }
+
+
+class MemoizationStats(object):
+    """Hit and miss counts of the result cache (overall and by module type)."""
+
+    def __init__(self):
+
+        self._counts: typing.Dict[str, typing.Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, module_type: str, event: str) -> None:
+
+        with self._lock:
+            counts = self._counts.setdefault(
+                module_type, {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+            )
+            counts[event] = counts.get(event, 0) + 1
+
+    def get_stats(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """Return the counts and hit rates, by module type (and for all module types, under '__all__')."""
+
+        with self._lock:
+            counts: typing.Dict[str, typing.Dict[str, typing.Any]] = {
+                k: dict(v) for k, v in self._counts.items()
+            }
+
+        total: typing.Dict[str, int] = {}
+        for module_counts in counts.values():
+            for event, count in module_counts.items():
+                total[event] = total.get(event, 0) + count
+        counts["__all__"] = total
+
+        for module_counts in counts.values():
+            hits = module_counts.get("memory_hits", 0) + module_counts.get(
+                "disk_hits", 0
+            )
+            calls = hits + module_counts.get("misses", 0)
+            module_counts["hit_rate"] = hits / calls if calls else 0.0
+
+        return counts
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._counts.clear()
+
+
+class MemoizationCache(object):
+    """A cache for module results, limited by size (in bytes), with an optional tier on disk.
+
+    Arguments:
+        max_memory_bytes: the maximum size of all results kept in memory
+        cache_dir: the folder for the disk tier (no disk tier if 'None')
+        max_disk_bytes: the maximum size of all results in the disk tier
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+        cache_dir: typing.Optional[str] = None,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ):
+
+        self._max_memory_bytes: int = max_memory_bytes
+        self._cache_dir: typing.Optional[str] = (
+            os.path.abspath(os.path.expanduser(cache_dir)) if cache_dir else None
+        )
+        self._max_disk_bytes: int = max_disk_bytes
+
+        self._items: (
+            "OrderedDict[str, typing.Tuple[typing.Mapping[str, typing.Any], int]]"
+        ) = OrderedDict()
+        self._memory_bytes: int = 0
+        self._lock = threading.Lock()
+
+        self.stats: MemoizationStats = MemoizationStats()
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    @property
+    def memory_items(self) -> int:
+        return len(self._items)
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self._cache_dir, f"{key}.pickle")  # type: ignore
+
+    def _add_to_memory(self, key: str, result: typing.Mapping[str, typing.Any]) -> None:
+
+        frozen, size = _freeze_result(result)
+        if size > self._max_memory_bytes:
+            return
+
+        with self._lock:
+            if key in self._items.keys():
+                self._memory_bytes -= self._items.pop(key)[1]
+            self._items[key] = (frozen, size)
+            self._memory_bytes += size
+            while self._memory_bytes > self._max_memory_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self._memory_bytes -= evicted_size
+
+    def get(self, key: str, module_type: str) -> typing.Any:
+        """Return the cached result for a key, or '_NOT_CACHED'."""
+
+        with self._lock:
+            item = self._items.get(key, None)
+            if item is not None:
+                self._items.move_to_end(key)
+        if item is not None:
+            self.stats.add(module_type, "memory_hits")
+            return _thaw_result(item[0])
+
+        if self._cache_dir is not None:
+            path = self._get_path(key)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                result = pickle.loads(data)
+                # the modification time is used to find the least recently used results on disk
+                os.utime(path)
+            except FileNotFoundError:
+                result = _NOT_CACHED
+            except Exception as e:
+                log.warning(f"Can't read cached result '{path}': {e}")
+                result = _NOT_CACHED
+
+            if result is not _NOT_CACHED:
+                self._add_to_memory(key, result)
+                self.stats.add(module_type, "disk_hits")
+                return result
+
+        self.stats.add(module_type, "misses")
+        return _NOT_CACHED
+
+    def put(self, key: str, result: typing.Mapping[str, typing.Any]) -> None:
+
+        self._add_to_memory(key, result)
+
+        if self._cache_dir is not None:
+            try:
+                self._write_to_disk(key, result)
+            except Exception as e:
+                log.warning(
+                    f"Can't write result to cache folder '{self._cache_dir}': {e}"
+                )
+
+    def _write_to_disk(self, key: str, result: typing.Mapping[str, typing.Any]) -> None:
+
+        data = pickle.dumps(dict(result), protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self._max_disk_bytes:
+            return
+
+        os.makedirs(self._cache_dir, exist_ok=True)  # type: ignore
+        path = self._get_path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        entries = []
+        total = 0
+        with os.scandir(self._cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".pickle"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                    total += stat.st_size
+        for _, size, entry_path in sorted(entries):
+            if total <= self._max_disk_bytes:
+                break
+            if entry_path == path:
+                continue
+            try:
+                os.remove(entry_path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._items.clear()
+            self._memory_bytes = 0
+
+
+_CACHE: typing.Optional[MemoizationCache] = None
+
+
+def enable_memoization(
+    max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+    cache_dir: typing.Optional[str] = None,
+    max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+) -> MemoizationCache:
+    """Enable result memoization for all deterministic modules."""
+
+    global _CACHE
+    _CACHE = MemoizationCache(
+        max_memory_bytes=max_memory_bytes,
+        cache_dir=cache_dir,
+        max_disk_bytes=max_disk_bytes,
+    )
+    return _CACHE
+
+
+def disable_memoization() -> None:
+
+    global _CACHE
+    _CACHE = None
+
+
+def get_memoization_cache() -> typing.Optional[MemoizationCache]:
+
+    return _CACHE
+
+
+def get_memoization_stats() -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    """Return the hit/miss counts and hit rates of the result cache, by module type."""
+
+    if _CACHE is None:
+        return {}
+    return _CACHE.stats.get_stats()
+
+
+def log_memoization_stats() -> None:
+
+    for module_type, stats in sorted(get_memoization_stats().items()):
+        log.info(
+            f"Result cache for '{module_type}': {stats['memory_hits']} memory hits, {stats['disk_hits']} disk hits, {stats['misses']} misses, hit rate: {stats['hit_rate']:.1%}"
+        )
+
+
+def is_memoized(module: typing.Any) -> bool:
+    """Check whether the results of a module are memoized."""
+
+    return _CACHE is not None and is_deterministic(module)
+
+
+def memoized_process(
+    process: typing.Callable[..., None],
+    module: typing.Any,
+    inputs: typing.Any,
+    outputs: typing.Any,
+    **kwargs: typing.Any,
+) -> None:
+    """Set the outputs of a 'process' call from the result cache, or run it, and add its outputs to the cache."""
+
+    cache = _CACHE
+    if cache is None:
+        return process(module, inputs, outputs, **kwargs)
+
+    module_type = str(getattr(module, "_module_type_name", module.__class__.__name__))
+    try:
+        key = get_cache_key(module, inputs)
+    except UnhashableValueException as e:
+        log.debug(f"Not memoizing result of '{module_type}': {e}")
+        return process(module, inputs, outputs, **kwargs)
+
+    result = cache.get(key, module_type)
+    if result is not _NOT_CACHED:
+        outputs.set_values(**result)
+        return
+
+    process(module, inputs, outputs, **kwargs)
+
+    result = {
+        field_name: outputs.get_value_data(field_name)
+        for field_name in outputs.get_all_field_names()
+    }
+    try:
+        cache.put(key, result)
+    except Exception as e:
+        log.debug(f"Can't cache result of '{module_type}': {e}")
+
+
+if os.environ.get(MEMOIZE_ENV_VAR, "").lower() not in ["", "0", "false", "no"]:
+    _max_memory_bytes = os.environ[MEMOIZE_ENV_VAR]
+    enable_memoization(
+        max_memory_bytes=(
+            int(_max_memory_bytes)
+            if _max_memory_bytes.isdigit()
+            else DEFAULT_MAX_MEMORY_BYTES
+        ),
+        cache_dir=os.environ.get(MEMOIZE_DIR_ENV_VAR, None),
+        max_disk_bytes=int(
+            os.environ.get(MEMOIZE_MAX_DISK_BYTES_ENV_VAR, DEFAULT_MAX_DISK_BYTES)
+        ),
+    )
+    atexit.register(log_memoization_stats)
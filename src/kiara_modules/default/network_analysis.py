@@ -1,10 +1,7 @@
 # -*- coding: utf-8 -*-
 import copy
-import networkx as nx
-import pyarrow
 import typing
 from enum import Enum
-from networkx import Graph
 from pydantic import Field, validator
 
 from kiara import KiaraModule
@@ -12,6 +9,11 @@ from kiara.config import KiaraModuleConfig
 from kiara.data.values import ValueSchema
 from kiara.exceptions import KiaraProcessingException
 from kiara.module import StepInputs, StepOutputs
+from kiara_modules.default.instrumentation import instrumented
+
+if typing.TYPE_CHECKING:
+    import pyarrow
+    from networkx import Graph
 
 
 class GraphTypesEnum(Enum):
@@ -42,6 +44,7 @@ class CreateGraphConfig(KiaraModuleConfig):
         return v
 
 
+@instrumented
 class CreateGraphFromEdgesTableModule(KiaraModule):
     """Create a directed network graph object from tabular data."""
 
@@ -95,6 +98,8 @@ class CreateGraphFromEdgesTableModule(KiaraModule):
 
     def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
 
+        import networkx as nx
+
         if self.get_config_value("graph_type") is not None:
             _graph_type = self.get_config_value("graph_type")
         else:
@@ -141,6 +146,7 @@ class CreateGraphFromEdgesTableModule(KiaraModule):
         outputs.graph = graph
 
 
+@instrumented
 class AugmentNetworkGraphModule(KiaraModule):
     """Augment an existing graph with node attributes."""
 
@@ -202,6 +208,7 @@ class AugmentNetworkGraphModule(KiaraModule):
         outputs.graph = graph
 
 
+@instrumented
 class AddNodesToNetworkGraphModule(KiaraModule):
     """Add nodes to an existing graph."""
 
@@ -233,7 +240,7 @@ class AddNodesToNetworkGraphModule(KiaraModule):
 
     def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
 
-        nodes_table_value = inputs.get_value_obj("node_attributes")
+        nodes_table_value = inputs.get_value_obj("nodes")
 
         if nodes_table_value.is_none:
             # we return the graph as is
@@ -275,11 +282,17 @@ class FindShortestPathModuleConfig(KiaraModuleConfig):
         return v
 
 
+@instrumented
 class FindShortestPathModule(KiaraModule):
     """Find the shortest path between two nodes in a graph."""
 
     _config_cls = FindShortestPathModuleConfig
 
+    @classmethod
+    def is_deterministic(cls) -> bool:
+        """Check whether this module type is deterministic (its outputs only depend on its inputs and config)."""
+        return True
+
     def create_input_schema(
         self,
     ) -> typing.Mapping[
@@ -320,6 +333,8 @@ class FindShortestPathModule(KiaraModule):
 
     def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
 
+        import networkx as nx
+
         mode = self.get_config_value("mode")
         if mode != "single-pair":
             raise NotImplementedError()
@@ -354,11 +369,17 @@ class ExtractGraphPropertiesModuleConfig(KiaraModuleConfig):
     density: bool = Field(description="Calculate the graph density.", default=True)
 
 
+@instrumented
 class ExtractGraphPropertiesModule(KiaraModule):
     """Extract inherent properties of a network graph."""
 
     _config_cls = ExtractGraphPropertiesModuleConfig
 
+    @classmethod
+    def is_deterministic(cls) -> bool:
+        """Check whether this module type is deterministic (its outputs only depend on its inputs and config)."""
+        return True
+
     def create_input_schema(
         self,
     ) -> typing.Mapping[
@@ -403,6 +424,8 @@ class ExtractGraphPropertiesModule(KiaraModule):
 
     def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
 
+        import networkx as nx
+
         graph: Graph = inputs.graph
 
         if self.get_config_value("find_largest_component"):
@@ -425,3 +448,122 @@ class ExtractGraphPropertiesModule(KiaraModule):
         if self.get_config_value("density"):
             density = nx.density(graph)
             outputs.set_values(density=density)
+
+
+def extract_nodes_table(
+    table: "pyarrow.Table",
+    column_groups: typing.Iterable[typing.Mapping[str, str]],
+    index_column_name: str,
+) -> "pyarrow.Table":
+    """Create a nodes table from a 'wide' table, where every row contains the attributes of more than one node.
+
+    Every column group maps the output column names to the source columns that contain the attributes of one node
+    of a row (e.g. one group for the 'source', one for the 'target' node of an edge). The column groups are stacked
+    (without copying the column data), and only the first row for every node id (in the index column) is kept.
+    """
+
+    import pyarrow
+    import pyarrow.compute as pc
+
+    groups = list(column_groups)
+    if not groups:
+        raise KiaraProcessingException(
+            "Can't extract nodes table: no column groups specified."
+        )
+
+    output_names = list(groups[0].keys())
+    if index_column_name not in output_names:
+        raise KiaraProcessingException(
+            f"Can't extract nodes table: index column '{index_column_name}' not in column group. Available columns: {', '.join(output_names)}"
+        )
+
+    tables: typing.List[pyarrow.Table] = []
+    for group in groups:
+        if set(group.keys()) != set(output_names):
+            raise KiaraProcessingException(
+                f"Can't extract nodes table: all column groups must have the same columns ({', '.join(output_names)})."
+            )
+        missing = [c for c in group.values() if c not in table.column_names]
+        if missing:
+            raise KiaraProcessingException(
+                f"Can't extract nodes table: source table missing column(s): {', '.join(missing)}. Available columns: {', '.join(table.column_names)}."
+            )
+
+        columns = [table.column(group[name]) for name in output_names]
+        if tables:
+            columns = [
+                (
+                    column.cast(tables[0].schema.field(name).type)
+                    if column.type != tables[0].schema.field(name).type
+                    else column
+                )
+                for name, column in zip(output_names, columns)
+            ]
+        tables.append(pyarrow.Table.from_arrays(columns, names=output_names))
+
+    stacked = pyarrow.concat_tables(tables)
+
+    # 'unique' returns ids in order of their first occurrence, so the rows keep their original order
+    ids = stacked.column(index_column_name)
+    first_rows = pc.index_in(pc.unique(ids), value_set=ids)
+    return stacked.take(first_rows)
+
+
+class ExtractNodesTableModuleConfig(KiaraModuleConfig):
+
+    column_groups: typing.List[typing.Dict[str, str]] = Field(
+        description="A list of column groups, each a map of (output) column names to the columns in the source table that contain the attributes of one node per row."
+    )
+    index_column_name: str = Field(
+        description="The name of the (output) column that contains the node id.",
+        default="id",
+    )
+
+
+@instrumented
+class ExtractNodesTableModule(KiaraModule):
+    """Extract a table of nodes (one row per node id) from a table where each row contains attributes of several nodes.
+
+    A typical example would be an edges table that also contains the attributes of the source and target nodes of each
+    edge.
+    """
+
+    _config_cls = ExtractNodesTableModuleConfig
+
+    def create_input_schema(
+        self,
+    ) -> typing.Mapping[
+        str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
+    ]:
+        return {
+            "table": {
+                "type": "table",
+                "doc": "The table that contains the node attributes.",
+            }
+        }
+
+    def create_output_schema(
+        self,
+    ) -> typing.Mapping[
+        str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
+    ]:
+        return {
+            "table": {
+                "type": "table",
+                "doc": "A normalized table where every row represents the metadata for a single network node.",
+            },
+            "index_column_name": {
+                "type": "string",
+                "doc": "The name of the column that contains the node identifier.",
+            },
+        }
+
+    def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
+
+        index_column_name = self.get_config_value("index_column_name")
+        outputs.table = extract_nodes_table(
+            inputs.table,
+            column_groups=self.get_config_value("column_groups"),
+            index_column_name=index_column_name,
+        )
+        outputs.index_column_name = index_column_name
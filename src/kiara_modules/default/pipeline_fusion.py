@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+
+"""Fuse pipelines that only consist of pure modules into a single module.
+
+A module is considered pure if its class has an ``is_pure`` class method that returns 'True', and if it has an
+``evaluate`` method that computes its (single) output from its inputs (passed in as keyword arguments), without any side
+effects. A fused pipeline calls the ``evaluate`` methods of its steps directly, in order, and passes intermediate values
+from one step to the next as plain Python objects, without registering them in the data registry.
+"""
+
+import json
+import os
+import typing
+from pydantic import Field
+
+from kiara import KiaraModule
+from kiara.config import KiaraModuleConfig
+from kiara.data.values import ValueSchema
+from kiara.exceptions import KiaraProcessingException
+from kiara.module import StepInputs, StepOutputs
+from kiara_modules.default.defaults import KIARA_MODULES_DEFAULT_PIPELINES_FOLDER
+from kiara_modules.default.instrumentation import instrumented
+from kiara_modules.default.pipeline_manifest import (
+    get_pipeline_configs,
+    get_pipeline_manifest,
+)
+
+if typing.TYPE_CHECKING:
+    from kiara import Kiara
+
+
+def find_pipeline_files(
+    folder: str = KIARA_MODULES_DEFAULT_PIPELINES_FOLDER,
+) -> typing.Dict[str, str]:
+    """Find all pipeline description files in a folder (recursively), and return a map of pipeline names to paths."""
+
+    manifest = get_pipeline_manifest(folder)
+    return {
+        name: os.path.join(folder, details["path"])
+        for name, details in manifest["pipelines"].items()
+    }
+
+
+def is_pure_module(module: KiaraModule) -> bool:
+    """Check whether a module is marked as pure, and can be evaluated directly."""
+
+    is_pure = getattr(module, "is_pure", None)
+    if not callable(is_pure) or not is_pure():
+        return False
+
+    return callable(getattr(module, "evaluate", None))
+
+
+class FusedStep(object):
+    """A single step of a fused pipeline."""
+
+    def __init__(
+        self,
+        step_id: str,
+        evaluate: typing.Callable[..., typing.Mapping[str, typing.Any]],
+        input_schemas: typing.Mapping[str, ValueSchema],
+        output_schemas: typing.Mapping[str, ValueSchema],
+        input_links: typing.Mapping[str, typing.Tuple[str, str]],
+    ):
+
+        self.step_id: str = step_id
+        self.evaluate: typing.Callable[..., typing.Mapping[str, typing.Any]] = evaluate
+        self.input_schemas: typing.Mapping[str, ValueSchema] = input_schemas
+        self.output_schemas: typing.Mapping[str, ValueSchema] = output_schemas
+        self.input_links: typing.Mapping[str, typing.Tuple[str, str]] = input_links
+
+
+class FusedPipeline(object):
+    """A pipeline of pure modules, compiled into a single function.
+
+    Arguments:
+        steps: the steps of the pipeline, in processing order
+        input_aliases: a map of '<step_id>__<input_name>' strings to the pipeline input names
+        output_aliases: a map of '<step_id>__<output_name>' strings to the pipeline output names
+    """
+
+    def __init__(
+        self,
+        steps: typing.Iterable[FusedStep],
+        input_aliases: typing.Mapping[str, str],
+        output_aliases: typing.Mapping[str, str],
+    ):
+
+        self._steps: typing.List[FusedStep] = list(steps)
+        self._input_aliases: typing.Mapping[str, str] = input_aliases
+        self._output_aliases: typing.Mapping[str, str] = output_aliases
+
+        input_schemas: typing.Dict[str, ValueSchema] = {}
+        output_schemas: typing.Dict[str, ValueSchema] = {}
+        for step in self._steps:
+            for input_name, schema in step.input_schemas.items():
+                alias = input_aliases.get(f"{step.step_id}__{input_name}")
+                if alias is not None:
+                    input_schemas.setdefault(alias, schema)
+            for output_name, schema in step.output_schemas.items():
+                alias = output_aliases.get(f"{step.step_id}__{output_name}")
+                if alias is not None:
+                    output_schemas[alias] = schema
+
+        self.input_schemas: typing.Mapping[str, ValueSchema] = input_schemas
+        self.output_schemas: typing.Mapping[str, ValueSchema] = output_schemas
+
+    def evaluate(self, **inputs: typing.Any) -> typing.Mapping[str, typing.Any]:
+        """Evaluate all steps in order, and return the (aliased) pipeline outputs."""
+
+        step_outputs: typing.Dict[str, typing.Mapping[str, typing.Any]] = {}
+        result: typing.Dict[str, typing.Any] = {}
+
+        for step in self._steps:
+
+            step_inputs = {}
+            for input_name in step.input_schemas.keys():
+                link = step.input_links.get(input_name, None)
+                if link is not None:
+                    step_inputs[input_name] = step_outputs[link[0]][link[1]]
+                else:
+                    alias = self._input_aliases[f"{step.step_id}__{input_name}"]
+                    step_inputs[input_name] = inputs[alias]
+
+            outputs = step.evaluate(**step_inputs)
+            step_outputs[step.step_id] = outputs
+
+            for output_name, value in outputs.items():
+                output_alias = self._output_aliases.get(
+                    f"{step.step_id}__{output_name}"
+                )
+                if output_alias is not None:
+                    result[output_alias] = value
+
+        return result
+
+
+def _create_aliases(
+    aliases: typing.Union[str, typing.Mapping[str, str]],
+    fields: typing.Iterable[str],
+) -> typing.Mapping[str, str]:
+
+    if aliases == "auto":
+        return {field: field for field in fields}
+    elif isinstance(aliases, str):
+        raise KiaraProcessingException(
+            f"Can't fuse pipeline, invalid aliases: {aliases}"
+        )
+    else:
+        return aliases
+
+
+def _module_evaluate(
+    module: KiaraModule,
+) -> typing.Callable[..., typing.Mapping[str, typing.Any]]:
+
+    output_names = list(module.output_names)
+    if len(output_names) != 1:
+        raise KiaraProcessingException(
+            f"Can't fuse pipeline, module '{module.id}' does not have exactly one output."
+        )
+    output_name = output_names[0]
+    evaluate = module.evaluate  # type: ignore
+
+    def evaluate_module(**inputs: typing.Any) -> typing.Mapping[str, typing.Any]:
+        return {output_name: evaluate(**inputs)}
+
+    return evaluate_module
+
+
+def fuse_pipeline(
+    pipeline_config: typing.Mapping[str, typing.Any],
+    kiara: "Kiara",
+    pipeline_configs: typing.Optional[
+        typing.Mapping[str, typing.Mapping[str, typing.Any]]
+    ] = None,
+) -> FusedPipeline:
+    """Compile a pipeline description into a fused pipeline.
+
+    Steps that are (bundled) pipelines themselves are fused recursively, their descriptions are taken from the
+    pipeline manifest. A 'KiaraProcessingException' is raised if any of the steps uses a module that is not pure.
+    """
+
+    if pipeline_configs is None:
+        pipeline_configs = get_pipeline_configs()
+
+    steps_config: typing.List[typing.Mapping[str, typing.Any]] = pipeline_config[
+        "steps"
+    ]
+
+    steps: typing.Dict[str, FusedStep] = {}
+    for step_config in steps_config:
+
+        step_id = step_config["step_id"]
+        module_type = step_config["module_type"]
+
+        input_links: typing.Dict[str, typing.Tuple[str, str]] = {}
+        for input_name, link in step_config.get("input_links", {}).items():
+            if not isinstance(link, str) or link.count(".") != 1:
+                raise KiaraProcessingException(
+                    f"Can't fuse pipeline, unsupported input link for '{step_id}.{input_name}': {link}"
+                )
+            source_step_id, source_output = link.split(".")
+            input_links[input_name] = (source_step_id, source_output)
+
+        if module_type in pipeline_configs.keys():
+            child = fuse_pipeline(
+                pipeline_configs[module_type], kiara, pipeline_configs=pipeline_configs
+            )
+            steps[step_id] = FusedStep(
+                step_id=step_id,
+                evaluate=child.evaluate,
+                input_schemas=child.input_schemas,
+                output_schemas=child.output_schemas,
+                input_links=input_links,
+            )
+            continue
+
+        module = kiara.create_module(
+            step_id, module_type, module_config=step_config.get("module_config", None)
+        )
+        if not is_pure_module(module):
+            raise KiaraProcessingException(
+                f"Can't fuse pipeline, module type '{module_type}' (step '{step_id}') is not pure."
+            )
+        steps[step_id] = FusedStep(
+            step_id=step_id,
+            evaluate=_module_evaluate(module),
+            input_schemas=module.input_schemas,
+            output_schemas=module.output_schemas,
+            input_links=input_links,
+        )
+
+    ordered: typing.List[FusedStep] = []
+    done: typing.Set[str] = set()
+    while len(ordered) < len(steps):
+        ready = [
+            step
+            for step in steps.values()
+            if step.step_id not in done
+            and all(link[0] in done for link in step.input_links.values())
+        ]
+        if not ready:
+            raise KiaraProcessingException(
+                "Can't fuse pipeline, step dependencies are invalid or circular."
+            )
+        for step in ready:
+            ordered.append(step)
+            done.add(step.step_id)
+
+    input_aliases = _create_aliases(
+        pipeline_config.get("input_aliases", "auto"),
+        (
+            f"{step.step_id}__{input_name}"
+            for step in ordered
+            for input_name in step.input_schemas.keys()
+            if input_name not in step.input_links.keys()
+        ),
+    )
+    output_aliases = _create_aliases(
+        pipeline_config.get("output_aliases", "auto"),
+        (
+            f"{step.step_id}__{output_name}"
+            for step in ordered
+            for output_name in step.output_schemas.keys()
+        ),
+    )
+
+    return FusedPipeline(
+        steps=ordered, input_aliases=input_aliases, output_aliases=output_aliases
+    )
+
+
+class FusedPipelineModuleConfig(KiaraModuleConfig):
+
+    pipeline: str = Field(
+        description="The name of a bundled pipeline, or the path to a pipeline description file."
+    )
+
+
+@instrumented
+class FusedPipelineModule(KiaraModule):
+    """Run a pipeline of pure modules (like the bundled 'logic' pipelines) as a single, fused module.
+
+    The result is the same as running the pipeline itself, but intermediate values are passed between steps directly,
+    without being registered and validated. Processing delays configured on the steps are not simulated.
+
+    The input and output schemas are the ones of the (unfused) steps, so a pipeline that is run on arrays should be
+    one that declares array inputs (e.g. 'xor_array' instead of 'xor').
+    """
+
+    _config_cls = FusedPipelineModuleConfig
+
+    @property
+    def fused_pipeline(self) -> FusedPipeline:
+
+        fused = getattr(self, "_fused_pipeline", None)
+        if fused is None:
+            pipeline = self.get_config_value("pipeline")
+            pipeline_configs = get_pipeline_configs()
+            if pipeline in pipeline_configs.keys():
+                pipeline_config = pipeline_configs[pipeline]
+            elif os.path.isfile(pipeline):
+                with open(pipeline, encoding="utf-8") as f:
+                    pipeline_config = json.load(f)
+            else:
+                raise KiaraProcessingException(
+                    f"Can't fuse pipeline '{pipeline}': not a bundled pipeline or pipeline file. Available pipelines: {', '.join(pipeline_configs.keys())}"
+                )
+            fused = fuse_pipeline(
+                pipeline_config, self._kiara, pipeline_configs=pipeline_configs
+            )
+            self._fused_pipeline = fused
+        return fused
+
+    def create_input_schema(
+        self,
+    ) -> typing.Mapping[
+        str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
+    ]:
+        return self.fused_pipeline.input_schemas
+
+    def create_output_schema(
+        self,
+    ) -> typing.Mapping[
+        str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
+    ]:
+        return self.fused_pipeline.output_schemas
+
+    def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
+
+        input_values = {
+            input_name: getattr(inputs, input_name) for input_name in self.input_names
+        }
+        result = self.fused_pipeline.evaluate(**input_values)
+        outputs.set_values(**result)
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+
+"""A pre-validated index of the pipeline descriptions in a folder.
+
+Parsing every pipeline description file whenever pipelines are looked up by this package (e.g. to fuse pipelines, see
+[kiara_modules.default.pipeline_fusion][]) gets slow once a folder contains more than a handful of them. The manifest
+contains all pipelines of a folder (name, documentation, input/output aliases, step graph and the full description),
+and is stored as a single file. It is re-created whenever a description file is added, removed or modified (as detected
+by its modification time), so the description files themselves only need to be parsed after they changed. kiara's own
+pipeline discovery (via the 'kiara.pipelines' entry point) does not use the manifest, so it doesn't change how long it
+takes kiara to start.
+
+The manifest for the bundled pipelines can be created at build time (``make pipeline-manifest``), otherwise it is
+created on first use, in the user cache folder. Since installing a package doesn't preserve modification times, the
+bundled manifest is validated by the size and content hash of the description files instead, and then stored in the
+user cache folder (with the modification times of the installed files).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import typing
+
+from kiara_modules.default import log
+from kiara_modules.default.defaults import (
+    KIARA_MODULES_DEFAULT_PIPELINE_MANIFESTS_FOLDER,
+    KIARA_MODULES_DEFAULT_PIPELINES_FOLDER,
+    KIARA_MODULES_DEFAULT_RESOURCES_FOLDER,
+)
+
+PIPELINE_MANIFEST_VERSION = 2
+BUNDLED_PIPELINE_MANIFEST = os.path.join(
+    KIARA_MODULES_DEFAULT_RESOURCES_FOLDER, "pipelines_manifest.json"
+)
+
+
+def get_pipeline_file_mtimes(folder: str) -> typing.Dict[str, int]:
+    """Return the modification times of all pipeline description files in a folder (recursively), by relative path."""
+
+    result = {}
+    todo = [folder]
+    while todo:
+        with os.scandir(todo.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    todo.append(entry.path)
+                elif entry.name.endswith(".json") and entry.is_file():
+                    rel_path = os.path.relpath(entry.path, folder)
+                    result[rel_path] = entry.stat().st_mtime_ns
+    return result
+
+
+def get_pipeline_file_checksums(
+    folder: str, rel_paths: typing.Iterable[str]
+) -> typing.Dict[str, str]:
+    """Return the size and sha256 hash ('<size>:<hash>') of pipeline description files in a folder, by relative path."""
+
+    result = {}
+    for rel_path in rel_paths:
+        with open(os.path.join(folder, rel_path), "rb") as f:
+            content = f.read()
+        result[rel_path] = f"{len(content)}:{hashlib.sha256(content).hexdigest()}"
+    return result
+
+
+def validate_pipeline_config(
+    pipeline_config: typing.Mapping[str, typing.Any],
+) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+    """Validate a pipeline description, and return its step graph (module type and dependencies by step id).
+
+    Raises a 'ValueError' if the description is invalid.
+    """
+
+    if not pipeline_config.get("module_type_name"):
+        raise ValueError("No 'module_type_name' specified.")
+
+    steps = pipeline_config.get("steps", None)
+    if not steps or not isinstance(steps, typing.Sequence):
+        raise ValueError("No 'steps' specified.")
+
+    step_graph: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+    for step in steps:
+        step_id = step.get("step_id", None)
+        if not step_id or not step.get("module_type", None):
+            raise ValueError(
+                f"Invalid step, 'step_id' and 'module_type' required: {step}"
+            )
+        if step_id in step_graph.keys():
+            raise ValueError(f"Duplicate step id: {step_id}")
+
+        depends_on = set()
+        for input_name, link in step.get("input_links", {}).items():
+            links = [link] if isinstance(link, str) else link
+            for _link in links:
+                if not isinstance(_link, str) or "." not in _link:
+                    raise ValueError(
+                        f"Invalid input link for '{step_id}.{input_name}': {_link}"
+                    )
+                depends_on.add(_link.split(".")[0])
+
+        step_graph[step_id] = {
+            "module_type": step["module_type"],
+            "depends_on": sorted(depends_on),
+        }
+
+    for step_id, details in step_graph.items():
+        missing = [d for d in details["depends_on"] if d not in step_graph.keys()]
+        if missing:
+            raise ValueError(
+                f"Step '{step_id}' links to unknown step(s): {', '.join(missing)}"
+            )
+
+    for key in ["input_aliases", "output_aliases"]:
+        aliases = pipeline_config.get(key, "auto")
+        if not isinstance(aliases, (str, typing.Mapping)):
+            raise ValueError(f"Invalid '{key}': {aliases}")
+
+    return step_graph
+
+
+def create_pipeline_manifest(folder: str) -> typing.Dict[str, typing.Any]:
+    """Parse and validate all pipeline description files in a folder, and create a manifest for them.
+
+    Invalid description files are not included in the manifest pipelines, but listed (with the reason) under 'errors'.
+    """
+
+    file_mtimes = get_pipeline_file_mtimes(folder)
+
+    pipelines: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+    errors: typing.Dict[str, str] = {}
+    for rel_path in sorted(file_mtimes.keys()):
+        path = os.path.join(folder, rel_path)
+        try:
+            with open(path, encoding="utf-8") as f:
+                pipeline_config = json.load(f)
+            step_graph = validate_pipeline_config(pipeline_config)
+        except Exception as e:
+            log.warning(f"Ignoring invalid pipeline description '{path}': {e}")
+            errors[rel_path] = str(e)
+            continue
+
+        name = pipeline_config["module_type_name"]
+        if name in pipelines.keys():
+            errors[rel_path] = f"Duplicate pipeline name: {name}"
+            continue
+
+        pipelines[name] = {
+            "path": rel_path,
+            "doc": pipeline_config.get("doc", pipeline_config.get("documentation")),
+            "input_aliases": pipeline_config.get("input_aliases", "auto"),
+            "output_aliases": pipeline_config.get("output_aliases", "auto"),
+            "step_graph": step_graph,
+            "config": pipeline_config,
+        }
+
+    return {
+        "version": PIPELINE_MANIFEST_VERSION,
+        "files": file_mtimes,
+        "checksums": get_pipeline_file_checksums(folder, file_mtimes.keys()),
+        "pipelines": pipelines,
+        "errors": errors,
+    }
+
+
+def write_pipeline_manifest(
+    manifest: typing.Mapping[str, typing.Any], path: str
+) -> None:
+
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    # a unique temporary file, so processes that write the same manifest at the same time don't clobber each other
+    f = tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=folder, suffix=".tmp", delete=False
+    )
+    try:
+        with f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        # temporary files are only readable by their owner, the bundled manifest must be readable by everyone
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, path)
+    except Exception:
+        if os.path.exists(f.name):
+            os.remove(f.name)
+        raise
+
+
+def _load_manifest(path: str) -> typing.Optional[typing.Dict[str, typing.Any]]:
+
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except Exception as e:
+        log.warning(f"Ignoring invalid pipeline manifest '{path}': {e}")
+        return None
+
+    if manifest.get("version") != PIPELINE_MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def _load_bundled_manifest(
+    folder: str, file_mtimes: typing.Mapping[str, int]
+) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    """Load the pre-built manifest for the bundled pipelines, if the sizes and hashes of all description files match."""
+
+    manifest = _load_manifest(BUNDLED_PIPELINE_MANIFEST)
+    if manifest is None or manifest["checksums"].keys() != file_mtimes.keys():
+        return None
+    if manifest["checksums"] != get_pipeline_file_checksums(folder, file_mtimes.keys()):
+        return None
+
+    return dict(manifest, files=file_mtimes)
+
+
+_MANIFESTS: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+
+
+def get_pipeline_manifest(
+    folder: str = KIARA_MODULES_DEFAULT_PIPELINES_FOLDER,
+) -> typing.Mapping[str, typing.Any]:
+    """Return the (up-to-date) manifest for the pipeline descriptions in a folder.
+
+    A previously created manifest (from the user cache folder) is used if the modification times of all description
+    files are unchanged. Otherwise, for the bundled pipelines, the pre-built manifest is used if the sizes and content
+    hashes of all description files match. If neither is valid, the manifest is re-created. In both latter cases, the
+    manifest is stored in the user cache folder.
+    """
+
+    abs_folder = os.path.abspath(folder)
+    file_mtimes = get_pipeline_file_mtimes(abs_folder)
+
+    cached = _MANIFESTS.get(abs_folder, None)
+    if cached is not None and cached["files"] == file_mtimes:
+        return cached
+
+    cache_path = os.path.join(
+        KIARA_MODULES_DEFAULT_PIPELINE_MANIFESTS_FOLDER,
+        f"{hashlib.sha256(abs_folder.encode()).hexdigest()}.json",
+    )
+    manifest = _load_manifest(cache_path)
+    if manifest is None or manifest["files"] != file_mtimes:
+        manifest = None
+        if abs_folder == os.path.abspath(KIARA_MODULES_DEFAULT_PIPELINES_FOLDER):
+            manifest = _load_bundled_manifest(abs_folder, file_mtimes)
+
+        if manifest is None:
+            manifest = create_pipeline_manifest(abs_folder)
+        try:
+            write_pipeline_manifest(manifest, cache_path)
+        except Exception as e:
+            log.warning(f"Can't write pipeline manifest '{cache_path}': {e}")
+
+    _MANIFESTS[abs_folder] = manifest
+    return manifest
+
+
+def get_pipeline_configs(
+    folder: str = KIARA_MODULES_DEFAULT_PIPELINES_FOLDER,
+) -> typing.Dict[str, typing.Mapping[str, typing.Any]]:
+    """Return the descriptions of all (valid) pipelines in a folder, by pipeline name."""
+
+    manifest = get_pipeline_manifest(folder)
+    return {name: details["config"] for name, details in manifest["pipelines"].items()}
+
+
+if __name__ == "__main__":
+
+    write_pipeline_manifest(
+        create_pipeline_manifest(KIARA_MODULES_DEFAULT_PIPELINES_FOLDER),
+        BUNDLED_PIPELINE_MANIFEST,
+    )
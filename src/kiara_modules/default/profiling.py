@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+"""Opt-in profiling of the ``process`` calls of the modules in this package.
+
+Profiling is enabled for all (instrumented) modules by setting the ``KIARA_MODULES_PROFILE_DIR`` environment variable
+to the folder the profiles should be written to, optionally restricted to a comma-separated list of module type names
+and/or (full) step ids in ``KIARA_MODULES_PROFILE``. These environment variables (or, from Python,
+[enable_profiling][kiara_modules.default.profiling.enable_profiling]) are the only way to select the modules to
+profile, so profiling works for all modules, without any changes to their configs or pipeline descriptions.
+
+Every profiled call is run under the deterministic profiler (``cProfile``) while its threads are also sampled in
+regular intervals. Two files are written per call, named after the pipeline, step id and module type:
+
+- ``<name>.pstats``: the ``cProfile`` statistics (for ``pstats``, *snakeviz*, ...)
+- ``<name>.collapsed``: the sampled stacks in 'collapsed' format (for *flamegraph.pl*, *speedscope*, ...)
+"""
+
+import collections
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+import types
+import typing
+
+from kiara_modules.default import log
+from kiara_modules.default.defaults import KIARA_MODULES_DEFAULT_PROFILES_FOLDER
+
+PROFILE_DIR_ENV_VAR = "KIARA_MODULES_PROFILE_DIR"
+PROFILE_TARGETS_ENV_VAR = "KIARA_MODULES_PROFILE"
+PROFILE_INTERVAL_ENV_VAR = "KIARA_MODULES_PROFILE_INTERVAL"
+
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+
+class ProfileSettings(object):
+    """Where to write profiles, which modules to profile, and how often to sample stacks (in seconds)."""
+
+    def __init__(
+        self,
+        profile_dir: str = KIARA_MODULES_DEFAULT_PROFILES_FOLDER,
+        targets: typing.Optional[typing.Iterable[str]] = None,
+        sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+    ):
+
+        self.profile_dir: str = os.path.abspath(os.path.expanduser(profile_dir))
+        self.targets: typing.Optional[typing.Set[str]] = (
+            set(targets) if targets else None
+        )
+        self.sample_interval: float = sample_interval
+
+
+_SETTINGS: typing.Optional[ProfileSettings] = None
+_ACTIVE = threading.local()
+_PROFILE_COUNTER = itertools.count()
+
+
+def enable_profiling(
+    profile_dir: str = KIARA_MODULES_DEFAULT_PROFILES_FOLDER,
+    targets: typing.Optional[typing.Iterable[str]] = None,
+    sample_interval: float = DEFAULT_SAMPLE_INTERVAL,
+) -> ProfileSettings:
+    """Profile all modules (or only the ones with a module type name or step id in 'targets')."""
+
+    global _SETTINGS
+    _SETTINGS = ProfileSettings(
+        profile_dir=profile_dir, targets=targets, sample_interval=sample_interval
+    )
+    return _SETTINGS
+
+
+def disable_profiling() -> None:
+
+    global _SETTINGS
+    _SETTINGS = None
+
+
+def get_profile_settings() -> typing.Optional[ProfileSettings]:
+
+    return _SETTINGS
+
+
+def is_profiled(module: typing.Any) -> bool:
+    """Check whether the 'process' calls of a module should be profiled."""
+
+    if _SETTINGS is None:
+        return False
+    if _SETTINGS.targets is None:
+        return True
+
+    names = {
+        getattr(module, "_module_type_name", None),
+        getattr(module, "id", None),
+        getattr(module, "full_id", None),
+    }
+    return bool(_SETTINGS.targets.intersection(names))
+
+
+def _frame_name(frame: typing.Any) -> str:
+
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(
+        ";", ":"
+    )
+
+
+class StackSampler(object):
+    """Sample thread stacks in regular intervals, and count identical (collapsed) stacks.
+
+    The thread that starts sampling is sampled, as well as all threads that are started while sampling (e.g. worker
+    pools).
+    """
+
+    def __init__(self, interval: float = DEFAULT_SAMPLE_INTERVAL):
+
+        self._interval: float = interval
+        self._ignored: typing.Set[int] = set()
+        self._stacks: typing.Counter[str] = collections.Counter()
+        self._stop = threading.Event()
+        self._thread: typing.Optional[threading.Thread] = None
+
+    @property
+    def stacks(self) -> typing.Mapping[str, int]:
+        return self._stacks
+
+    def _sample(self) -> None:
+
+        while not self._stop.wait(self._interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in self._ignored:
+                    continue
+                stack = []
+                current: typing.Optional[types.FrameType] = frame
+                while current is not None:
+                    stack.append(_frame_name(current))
+                    current = current.f_back
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+
+        self._ignored = set(sys._current_frames().keys())
+        self._ignored.discard(threading.get_ident())
+
+        self._thread = threading.Thread(
+            target=self._sample, name="kiara_modules_stack_sampler", daemon=True
+        )
+        self._thread.start()
+        self._ignored.add(self._thread.ident)  # type: ignore
+
+    def stop(self) -> None:
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def write_collapsed(self, path: str) -> None:
+
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self._stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+
+def _get_profile_name(module: typing.Any) -> str:
+
+    parts = [
+        getattr(module, "parent_id", None) or "module",
+        getattr(module, "id", None) or "unknown",
+        getattr(module, "_module_type_name", None) or module.__class__.__name__,
+        time.strftime("%Y%m%d-%H%M%S"),
+        f"{os.getpid()}-{next(_PROFILE_COUNTER)}",
+    ]
+    return ".".join(re.sub(r"[^\w\-]", "_", str(part)) for part in parts)
+
+
+def profile_process(
+    process: typing.Callable[..., None],
+    module: typing.Any,
+    inputs: typing.Any,
+    outputs: typing.Any,
+    **kwargs: typing.Any,
+) -> None:
+    """Run a 'process' call under the deterministic profiler and the stack sampler, and write both profiles.
+
+    Calls of (child) modules that are made while a profiled call is running in the same thread are included in the
+    profiles of the outer call, and not profiled separately.
+    """
+
+    if getattr(_ACTIVE, "profiling", False):
+        return process(module, inputs, outputs, **kwargs)
+
+    import cProfile
+
+    settings = _SETTINGS if _SETTINGS is not None else ProfileSettings()
+
+    profiler = cProfile.Profile()
+    sampler = StackSampler(interval=settings.sample_interval)
+    _ACTIVE.profiling = True
+    sampler.start()
+    profiler.enable()
+    try:
+        process(module, inputs, outputs, **kwargs)
+    finally:
+        profiler.disable()
+        sampler.stop()
+        _ACTIVE.profiling = False
+
+        try:
+            os.makedirs(settings.profile_dir, exist_ok=True)
+            base_path = os.path.join(settings.profile_dir, _get_profile_name(module))
+            profiler.dump_stats(f"{base_path}.pstats")
+            sampler.write_collapsed(f"{base_path}.collapsed")
+            log.info(f"Wrote profiles: {base_path}.pstats, {base_path}.collapsed")
+        except Exception as e:
+            log.warning(f"Can't write profiles to '{settings.profile_dir}': {e}")
+
+
+if os.environ.get(PROFILE_DIR_ENV_VAR, None):
+    enable_profiling(
+        profile_dir=os.environ[PROFILE_DIR_ENV_VAR],
+        targets=[
+            t.strip()
+            for t in os.environ.get(PROFILE_TARGETS_ENV_VAR, "").split(",")
+            if t.strip()
+        ],
+        sample_interval=float(
+            os.environ.get(PROFILE_INTERVAL_ENV_VAR, DEFAULT_SAMPLE_INTERVAL)
+        ),
+    )
@@ -1,17 +1,49 @@
 # -*- coding: utf-8 -*-
-import pyarrow
 import typing
 
 from kiara import KiaraModule
 from kiara.data.values import ValueSchema
 from kiara.module import StepInputs, StepOutputs
+from kiara_modules.default.instrumentation import instrumented
+from kiara_modules.default.network_analysis import extract_nodes_table
 
+if typing.TYPE_CHECKING:
+    import pyarrow
 
+SOURCE_JOURNAL_COLUMNS = [
+    "Id",
+    "LabelOrig",
+    "LabelTrans",
+    "Year",
+    "Type",
+    "Language",
+    "City",
+    "CountryOld",
+    "CountryNew",
+    "Latitude",
+    "Longitude",
+]
+TARGET_JOURNAL_COLUMNS = [
+    "Id",
+    "Year",
+    "LabelOrig",
+    "LabelTrans",
+    "Type",
+    "Language",
+    "City",
+    "CountryOld",
+    "CountryNew",
+    "Latitude",
+    "Longitude",
+]
+
+
+@instrumented
 class PrepareNodesTableLenaModule(KiaraModule):
     """Prepare tabular data so it can be used as a 'nodes_table' input in the a directed graph module.
 
     This is a very specific module, only accepting a very specific data format and as such only suitable as a proof-of-concept.
-    Later on, this will be replaced by a more generic module (or pipeline).
+    It's a pre-configured version of the generic 'extract_nodes_table' module, which should be used instead.
     """
 
     def create_input_schema(
@@ -40,42 +72,16 @@ class PrepareNodesTableLenaModule(KiaraModule):
     def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
 
         t: pyarrow.Table = inputs.table
-        df = t.to_pandas()
-
-        df1 = df.iloc[:, 0:11]
-        df1.columns = [
-            "Id",
-            "LabelOrig",
-            "LabelTrans",
-            "Year",
-            "Type",
-            "Language",
-            "City",
-            "CountryOld",
-            "CountryNew",
-            "Latitude",
-            "Longitude",
-        ]
-        df2 = df.iloc[
-            :, 11:
-        ]  # This slices the dataframe in half creating a df of just the TargetJournals data
-        df2.columns = [
-            "Id",
-            "Year",
-            "LabelOrig",
-            "LabelTrans",
-            "Type",
-            "Language",
-            "City",
-            "CountryOld",
-            "CountryNew",
-            "Latitude",
-            "Longitude",
-        ]
-        extr_nodes = df1.append(df2)
-        extr_nodes_unique = extr_nodes.drop_duplicates(subset=["Id"])
 
-        result = pyarrow.Table.from_pandas(extr_nodes_unique)
-        outputs.table = result
+        source_columns = t.column_names[0:11]
+        target_columns = t.column_names[11:22]
+        outputs.table = extract_nodes_table(
+            t,
+            column_groups=[
+                dict(zip(SOURCE_JOURNAL_COLUMNS, source_columns)),
+                dict(zip(TARGET_JOURNAL_COLUMNS, target_columns)),
+            ],
+            index_column_name="Id",
+        )
 
         outputs.index_column_name = "Id"
@@ -1,35 +1,227 @@
 # -*- coding: utf-8 -*-
-import dateutil
+import datetime
+import functools
 import re
 import typing
+import unicodedata
 from abc import abstractmethod
-from pydantic import Field
+from pydantic import BaseModel, Field, validator
 
 from kiara import KiaraModule
 from kiara.config import KiaraModuleConfig
 from kiara.data.values import ValueSchema
 from kiara.exceptions import KiaraProcessingException
 from kiara.module import StepInputs, StepOutputs
+from kiara_modules.default.array_data import combine_chunks
+from kiara_modules.default.instrumentation import instrumented
 
+if typing.TYPE_CHECKING:
+    import pyarrow as pa
 
+
+@functools.lru_cache(maxsize=256)
+def compile_regex(regex: str) -> typing.Pattern:
+    """Compile a regex, re-using the compiled pattern if the same regex was compiled before."""
+
+    return re.compile(regex)
+
+
+def to_named_group_regex(regex: str, group_name: str = "match") -> typing.Optional[str]:
+    """Rewrite a regex so its (only) capturing group is named, as required by the 'extract_regex' Arrow kernel.
+
+    A regex without capturing groups is wrapped in a single group that captures the whole match. Returns 'None' if the
+    regex has more than one capturing group, in which case it can't be used to extract a single value.
+    """
+
+    compiled = compile_regex(regex)
+
+    if compiled.groups == 0:
+        return f"(?P<{group_name}>{regex})"
+    elif compiled.groups > 1:
+        return None
+    elif compiled.groupindex:
+        return regex
+
+    escaped = False
+    in_class = False
+    for index, c in enumerate(regex):
+        if escaped:
+            escaped = False
+        elif c == "\\":
+            escaped = True
+        elif in_class:
+            if c == "]":
+                in_class = False
+        elif c == "[":
+            in_class = True
+        elif c == "(" and not regex.startswith("?", index + 1):
+            return f"{regex[0:index + 1]}?P<{group_name}>{regex[index + 1:]}"
+
+    return None
+
+
+def extract_first_match(
+    array: typing.Union["pa.Array", "pa.ChunkedArray"], regex: str
+) -> typing.Union["pa.Array", "pa.ChunkedArray"]:
+    """Extract the first match of a regex (or the regexes' single group) from every item of a string array.
+
+    Items without a match result in a null value. The 'extract_regex' Arrow kernel is used if the regex is compatible
+    with it, otherwise the compiled regex is applied to each item.
+    """
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    pattern = to_named_group_regex(regex)
+    if pattern is not None:
+        try:
+            extracted = pc.extract_regex(array, pattern=pattern)
+            return extracted.flatten()[0]
+        except pa.ArrowInvalid:
+            # the regex uses syntax that is not supported by re2, so we use the slow path
+            pass
+
+    compiled = compile_regex(regex)
+    result = []
+    for text in array.to_pylist():
+        matches = compiled.findall(text) if text is not None else None
+        result.append(matches[0] if matches else None)
+
+    return pa.array(result, type=pa.string())
+
+
+def find_all_matches(compiled: typing.Pattern, text: str) -> typing.List[str]:
+    """Return all matches of a compiled regex in a string.
+
+    If the regex has exactly one group, the value of the group is returned for each match, otherwise the whole match.
+    """
+
+    group = 1 if compiled.groups == 1 else 0
+    return [match.group(group) for match in compiled.finditer(text)]
+
+
+def extract_all_matches(
+    array: typing.Union["pa.Array", "pa.ChunkedArray"], regex: str
+) -> "pa.Array":
+    """Extract all matches of a regex from every item of a string array, as a list array.
+
+    Items without a match result in a null value.
+    """
+
+    import pyarrow as pa
+
+    compiled = compile_regex(regex)
+    result = []
+    for text in array.to_pylist():
+        matches = find_all_matches(compiled, text) if text is not None else None
+        result.append(matches if matches else None)
+
+    return pa.array(result, type=pa.list_(pa.string()))
+
+
+def parse_date(text: str, date_format: str) -> typing.Optional[datetime.datetime]:
+    """Parse a date string, trying the provided format first, and dateutil as a fallback.
+
+    Returns 'None' if the string can't be parsed.
+    """
+
+    import dateutil.parser
+
+    try:
+        return datetime.datetime.strptime(text, date_format)
+    except ValueError:
+        pass
+
+    try:
+        return dateutil.parser.parse(text)
+    except (ValueError, OverflowError):
+        return None
+
+
+DATE_PARSE_CHUNK_SIZE = 65536
+
+
+def parse_dates(
+    array: typing.Union["pa.Array", "pa.ChunkedArray"], date_format: str
+) -> "pa.ChunkedArray":
+    """Parse every item of a string array into a timestamp.
+
+    The array is parsed in chunks with the 'strptime' Arrow kernel. Only chunks that contain items the kernel can't
+    parse are parsed item by item (every distinct item once), using 'parse_date'. Items that can't be parsed at all
+    result in null values.
+    """
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    array = combine_chunks(array)
+    data_type = pa.timestamp("us")
+
+    chunks = []
+    for offset in range(0, len(array), DATE_PARSE_CHUNK_SIZE):
+        chunk = array.slice(offset, DATE_PARSE_CHUNK_SIZE)
+        try:
+            chunks.append(pc.strptime(chunk, format=date_format, unit="us"))
+            continue
+        except pa.ArrowInvalid:
+            pass
+
+        encoded = chunk.dictionary_encode()
+        parsed = [
+            parse_date(text, date_format) for text in encoded.dictionary.to_pylist()
+        ]
+        chunks.append(pa.array(parsed, type=data_type).take(encoded.indices))
+
+    return pa.chunked_array(chunks, type=data_type)
+
+
+class StringManipulationModuleConfig(KiaraModuleConfig):
+
+    array_mode: bool = Field(
+        description="Whether to process all items of a string array (and return an array of processed strings), instead of a single string.",
+        default=False,
+    )
+
+
+@instrumented
 class StringManipulationModule(KiaraModule):
+    """Base class for modules that transform a string into another string.
+
+    Subclasses need to implement ``process_string``. To process string arrays (in array mode, or when used via 'map'),
+    ``process_array`` is used, which by default calls ``process_string`` for every (non-null) item. Subclasses can
+    override it with a vectorized implementation.
+    """
+
+    _config_cls = StringManipulationModuleConfig
+
     def create_input_schema(
         self,
     ) -> typing.Mapping[
         str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
     ]:
 
-        return {"text": {"type": "string", "doc": "The input string."}}
+        if self.get_config_value("array_mode"):
+            return {"text": {"type": "array", "doc": "The input strings."}}
+        else:
+            return {"text": {"type": "string", "doc": "The input string."}}
 
     def create_output_schema(
         self,
     ) -> typing.Mapping[
         str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
     ]:
-        return {"text": {"type": "string", "doc": "The processed string."}}
+
+        if self.get_config_value("array_mode"):
+            return {"text": {"type": "array", "doc": "The processed strings."}}
+        else:
+            return {"text": {"type": "string", "doc": "The processed string."}}
 
     def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
 
+        if self.get_config_value("array_mode"):
+            outputs.text = self.process_array(inputs.text)
+            return
+
         input_string = inputs.text
         result = self.process_string(input_string)
         outputs.text = result
@@ -38,35 +230,188 @@ class StringManipulationModule(KiaraModule):
     def process_string(self, text: str) -> str:
         pass
 
+    def process_array(
+        self, array: typing.Union["pa.Array", "pa.ChunkedArray"]
+    ) -> typing.Union["pa.Array", "pa.ChunkedArray"]:
+        """Process every item of a string array, null items stay null."""
+
+        import pyarrow as pa
+
+        result = [
+            None if text is None else self.process_string(text)
+            for text in array.to_pylist()
+        ]
+        return pa.array(result, type=pa.string())
+
+
+class LowercaseModule(StringManipulationModule):
+    """Convert a string to lowercase."""
+
+    def process_string(self, text: str) -> str:
+        return text.lower()
+
+    def process_array(
+        self, array: typing.Union["pa.Array", "pa.ChunkedArray"]
+    ) -> typing.Union["pa.Array", "pa.ChunkedArray"]:
+        import pyarrow.compute as pc
+
+        return pc.utf8_lower(array)
+
+
+class StripModule(StringManipulationModule):
+    """Remove leading and trailing whitespace from a string."""
+
+    def process_string(self, text: str) -> str:
+        return text.strip()
+
+    def process_array(
+        self, array: typing.Union["pa.Array", "pa.ChunkedArray"]
+    ) -> typing.Union["pa.Array", "pa.ChunkedArray"]:
+        import pyarrow.compute as pc
+
+        return pc.utf8_trim_whitespace(array)
+
+
+UNICODE_NORMALIZATION_FORMS = ["NFC", "NFD", "NFKC", "NFKD"]
+
+
+class UnicodeNormalizeModuleConfig(StringManipulationModuleConfig):
 
+    form: str = Field(
+        description=f"The unicode normalization form. Available forms: {', '.join(UNICODE_NORMALIZATION_FORMS)}",
+        default="NFC",
+    )
+
+    @validator("form")
+    def _validate_form(cls, v):
+
+        if v not in UNICODE_NORMALIZATION_FORMS:
+            raise ValueError(f"'form' must be one of: [{UNICODE_NORMALIZATION_FORMS}]")
+        return v
+
+
+class UnicodeNormalizeModule(StringManipulationModule):
+    """Normalize the unicode representation of a string."""
+
+    _config_cls = UnicodeNormalizeModuleConfig
+
+    def process_string(self, text: str) -> str:
+        return unicodedata.normalize(self.get_config_value("form"), text)
+
+    def process_array(
+        self, array: typing.Union["pa.Array", "pa.ChunkedArray"]
+    ) -> typing.Union["pa.Array", "pa.ChunkedArray"]:
+        """Normalize every item of a string array.
+
+        Uses the 'utf8_normalize' kernel if the installed pyarrow version provides it. Otherwise, ASCII-only arrays
+        (which are normalized in every form) are returned as they are, and every distinct value of other arrays is
+        normalized once.
+        """
+
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        form = self.get_config_value("form")
+        if hasattr(pc, "utf8_normalize"):
+            return pc.utf8_normalize(array, form=form)
+
+        array = combine_chunks(array)
+        if pc.all(pc.string_is_ascii(array)).as_py() is not False:
+            return array
+
+        encoded = array.dictionary_encode()
+        normalized = [
+            unicodedata.normalize(form, text) for text in encoded.dictionary.to_pylist()
+        ]
+        return pa.array(normalized, type=pa.string()).take(encoded.indices)
+
+
+class ExtractDateModuleConfig(KiaraModuleConfig):
+
+    regex: str = Field(
+        description="The regex to find the date substring, the value of its (single) group, or the whole match if it has no group, is parsed.",
+        default=r"_(\d{4}-\d{2}-\d{2})_",
+    )
+    date_format: str = Field(
+        description="The format of the date substring. Substrings that don't match this format are parsed with dateutil.",
+        default="%Y-%m-%d",
+    )
+    array_mode: bool = Field(
+        description="Whether to extract the dates from all items of a string array (and return a timestamp array), instead of a single string.",
+        default=False,
+    )
+
+
+@instrumented
 class ExtractDateModule(KiaraModule):
+    """Extract a date from a string, or (in array mode) from every item of a string array.
+
+    In array mode, items that don't contain a (parsable) date result in null values.
+    """
+
+    _config_cls = ExtractDateModuleConfig
+
     def create_input_schema(
         self,
     ) -> typing.Mapping[
         str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
     ]:
 
-        return {"text": {"type": "string", "doc": "The input string."}}
+        if self.get_config_value("array_mode"):
+            return {"text": {"type": "array", "doc": "The input strings."}}
+        else:
+            return {"text": {"type": "string", "doc": "The input string."}}
 
     def create_output_schema(
         self,
     ) -> typing.Mapping[
         str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
     ]:
-        return {
-            "date": {"type": "date", "doc": "The date extracted from the input string."}
-        }
+
+        if self.get_config_value("array_mode"):
+            return {
+                "date": {
+                    "type": "array",
+                    "doc": "The dates extracted from the input strings.",
+                }
+            }
+        else:
+            return {
+                "date": {
+                    "type": "date",
+                    "doc": "The date extracted from the input string.",
+                }
+            }
 
     def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
 
+        if self.get_config_value("array_mode"):
+            outputs.date = self.process_array(inputs.text)
+            return
+
         text = inputs.text
+        regex = self.get_config_value("regex")
+
+        date_match = compile_regex(regex).findall(text)
+        if not date_match:
+            raise KiaraProcessingException(
+                f"Can't extract date, no match for regex: {regex}"
+            )
 
-        date_match = re.findall(r"_(\d{4}-\d{2}-\d{2})_", text)
-        assert date_match
+        d_obj = parse_date(date_match[0], self.get_config_value("date_format"))
+        if d_obj is None:
+            raise KiaraProcessingException(f"Can't parse date: {date_match[0]}")
 
-        d_obj = dateutil.parser.parse(date_match[0])  # type: ignore
         outputs.date = d_obj
 
+    def process_array(
+        self, array: typing.Union["pa.Array", "pa.ChunkedArray"]
+    ) -> "pa.ChunkedArray":
+        """Return the date for every item of a string array, items without a (parsable) date result in null values."""
+
+        date_strings = extract_first_match(array, self.get_config_value("regex"))
+        return parse_dates(date_strings, self.get_config_value("date_format"))
+
 
 class RegexModuleConfig(KiaraModuleConfig):
 
@@ -75,18 +420,37 @@ class RegexModuleConfig(KiaraModuleConfig):
         description="Whether to only return the first match, or all matches.",
         default=False,
     )
+    array_mode: bool = Field(
+        description="Whether to match all items of a string array (and return an array of matches), instead of a single string.",
+        default=False,
+    )
 
 
+@instrumented
 class RegexModule(KiaraModule):
+    """Match a regex against a string, or (in array mode) against every item of a string array.
+
+    If the regex has exactly one group, the value of the group is returned for every match, otherwise the whole match.
+    In array mode, items without a match result in null values.
+    """
 
     _config_cls = RegexModuleConfig
 
+    @classmethod
+    def is_deterministic(cls) -> bool:
+        """Check whether this module type is deterministic (its outputs only depend on its inputs and config)."""
+        return True
+
     def create_input_schema(
         self,
     ) -> typing.Mapping[
         str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
     ]:
-        return {"text": {"type": "string", "doc": "The text to match."}}
+
+        if self.get_config_value("array_mode"):
+            return {"text": {"type": "array", "doc": "The strings to match."}}
+        else:
+            return {"text": {"type": "string", "doc": "The text to match."}}
 
     def create_output_schema(
         self,
@@ -94,29 +458,154 @@ class RegexModule(KiaraModule):
         str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
     ]:
 
-        if self.get_config_value("only_first_match"):
+        only_first_match = self.get_config_value("only_first_match")
+        if self.get_config_value("array_mode"):
+            if only_first_match:
+                doc = "The first match for every item."
+            else:
+                doc = "A list of all matches for every item."
+            output_schema = {"text": {"type": "array", "doc": doc}}
+        elif only_first_match:
             output_schema = {"text": {"type": "string", "doc": "The first match."}}
         else:
-            raise NotImplementedError()
+            output_schema = {"text": {"type": "list", "doc": "All matches."}}
 
         return output_schema
 
     def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
 
+        if self.get_config_value("array_mode"):
+            outputs.text = self.process_array(inputs.text)
+            return
+
         text = inputs.text
         regex = self.get_config_value("regex")
-        matches = re.findall(regex, text)
-
-        if not matches:
-            raise KiaraProcessingException(f"No match for regex: {regex}")
+        compiled = compile_regex(regex)
 
         if self.get_config_value("only_first_match"):
+            matches = compiled.findall(text)
+            if not matches:
+                raise KiaraProcessingException(f"No match for regex: {regex}")
             result = matches[0]
         else:
-            result = matches
+            result = find_all_matches(compiled, text)
 
         outputs.text = result
 
+    def process_array(
+        self, array: typing.Union["pa.Array", "pa.ChunkedArray"]
+    ) -> typing.Union["pa.Array", "pa.ChunkedArray"]:
+        """Return the first match (or a list of all matches) for every item of a string array.
+
+        Items without a match result in a null value.
+        """
+
+        regex = self.get_config_value("regex")
+        if self.get_config_value("only_first_match"):
+            return extract_first_match(array, regex)
+        else:
+            return extract_all_matches(array, regex)
+
+
+EXTRACTOR_TYPES = ["string", "integer", "float", "date"]
+
+
+class RegexExtractorConfig(BaseModel):
+
+    regex: str = Field(
+        description="The regex to apply, the value of its (single) group, or of the whole match if it has no group, will be extracted."
+    )
+    type: str = Field(
+        description=f"The type of the extracted values. Available types: {', '.join(EXTRACTOR_TYPES)}",
+        default="string",
+    )
+    format: str = Field(
+        description="The format of the extracted values if they are dates.",
+        default="%Y-%m-%d",
+    )
+
+    @validator("type")
+    def _validate_type(cls, v):
+
+        if v not in EXTRACTOR_TYPES:
+            raise ValueError(f"'type' must be one of: [{EXTRACTOR_TYPES}]")
+        return v
+
+
+class ExtractRegexColumnsModuleConfig(KiaraModuleConfig):
+
+    extractors: typing.Dict[str, RegexExtractorConfig] = Field(
+        description="A map with the names of the columns to create as keys, and the extractor (regex, type) for each column as values."
+    )
+
+
+@instrumented
+class ExtractRegexColumnsModule(KiaraModule):
+    """Extract several values from every item of a string array, and return them as (typed) columns of a table.
+
+    This does the same as a set of 'map' steps with 'match_regex' (or 'extract_date') child modules over the same array,
+    but processes the whole array with one (vectorized) operation per extractor instead of running a module per item.
+    """
+
+    _config_cls = ExtractRegexColumnsModuleConfig
+
+    def create_input_schema(
+        self,
+    ) -> typing.Mapping[
+        str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
+    ]:
+        return {
+            "array": {
+                "type": "array",
+                "doc": "The strings to extract the values from.",
+            }
+        }
+
+    def create_output_schema(
+        self,
+    ) -> typing.Mapping[
+        str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
+    ]:
+
+        column_names = ", ".join(self.get_config_value("extractors").keys())
+        return {
+            "table": {
+                "type": "table",
+                "doc": f"A table with the extracted columns: {column_names}. Items without a match result in null values.",
+            }
+        }
+
+    def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
+
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        array = inputs.array
+        extractors: typing.Mapping[str, RegexExtractorConfig] = self.get_config_value(
+            "extractors"
+        )
+
+        columns = []
+        for column_name, extractor in extractors.items():
+
+            extracted = extract_first_match(array, extractor.regex)
+            try:
+                if extractor.type == "integer":
+                    extracted = pc.cast(extracted, pa.int64())
+                elif extractor.type == "float":
+                    extracted = pc.cast(extracted, pa.float64())
+                elif extractor.type == "date":
+                    extracted = pc.cast(
+                        parse_dates(extracted, extractor.format), pa.date32()
+                    )
+            except pa.ArrowInvalid as e:
+                raise KiaraProcessingException(
+                    f"Can't convert extracted values for column '{column_name}' to type '{extractor.type}': {e}"
+                )
+            columns.append(extracted)
+
+        outputs.table = pa.Table.from_arrays(columns, names=list(extractors.keys()))
+
 
 class ReplaceModuleConfig(KiaraModuleConfig):
 
@@ -127,9 +616,19 @@ class ReplaceModuleConfig(KiaraModuleConfig):
         description="The default value to use if the string to be replaced is not in the replacement map. By default, this just returns the string itself.",
         default=None,
     )
+    array_mode: bool = Field(
+        description="Whether to replace all items of a string array (and return the replaced array), instead of a single string.",
+        default=False,
+    )
 
 
+@instrumented
 class ReplaceStringModule(KiaraModule):
+    """Replace a string if it matches a key in a replacement map, or (in array mode) every matching item of a string array.
+
+    In array mode, the replacement map is applied to the whole array in one vectorized lookup. Dictionary-encoded
+    arrays are replaced by only rewriting their dictionary.
+    """
 
     _config_cls = ReplaceModuleConfig
 
@@ -139,25 +638,115 @@ class ReplaceStringModule(KiaraModule):
         str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
     ]:
 
-        return {"text": {"type": "string", "doc": "The input string."}}
+        if self.get_config_value("array_mode"):
+            return {"text": {"type": "array", "doc": "The input strings."}}
+        else:
+            return {"text": {"type": "string", "doc": "The input string."}}
 
     def create_output_schema(
         self,
     ) -> typing.Mapping[
         str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
     ]:
-        return {"text": {"type": "string", "doc": "The replaced string."}}
 
-    def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
+        if self.get_config_value("array_mode"):
+            return {"text": {"type": "array", "doc": "The replaced strings."}}
+        else:
+            return {"text": {"type": "string", "doc": "The replaced string."}}
+
+    @property
+    def replacement_arrays(self) -> typing.Tuple["pa.Array", "pa.Array"]:
+        """The keys and values of the replacement map, as a pair of arrays."""
+
+        import pyarrow as pa
+
+        replacement_arrays = getattr(self, "_replacement_arrays", None)
+        if replacement_arrays is None:
+            repl_map = self.get_config_value("replacement_map")
+            replacement_arrays = (
+                pa.array(repl_map.keys(), type=pa.string()),
+                pa.array(repl_map.values(), type=pa.string()),
+            )
+            self._replacement_arrays = replacement_arrays
+        return replacement_arrays
+
+    def replace(self, text: str) -> str:
 
-        text = inputs.text
         repl_map = self.get_config_value("replacement_map")
         default = self.get_config_value("default_value")
 
         if text not in repl_map.keys():
             if default is None:
-                outputs.text = text
+                return text
             else:
-                outputs.text = default
+                return default
+        else:
+            return repl_map[text]
+
+    def replace_values(self, values: "pa.Array") -> "pa.Array":
+        """Replace every item of a (non-chunked) string array.
+
+        Every item is looked up in the replacement keys with the 'index_in' kernel, and the result is assembled with a
+        single 'take' from the concatenation of replacement values, default value and original values. Null items stay
+        null.
+        """
+
+        import numpy as np
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        keys, replacements = self.replacement_arrays
+        default = self.get_config_value("default_value")
+
+        indices = pc.index_in(values, value_set=keys.cast(values.type))
+        found = pc.is_valid(indices).to_numpy(zero_copy_only=False)
+        valid = pc.is_valid(values).to_numpy(zero_copy_only=False)
+
+        default_index = len(keys)
+        original_indices = np.arange(len(values)) + default_index + 1
+        if default is None:
+            fallback_indices = original_indices
+        else:
+            fallback_indices = np.where(valid, default_index, original_indices)
+
+        take_indices = np.where(
+            found,
+            pc.fill_null(indices, 0).to_numpy(zero_copy_only=False),
+            fallback_indices,
+        )
+
+        candidates = pa.concat_arrays(
+            [
+                replacements.cast(values.type),
+                pa.array([default], type=values.type),
+                values,
+            ]
+        )
+        return candidates.take(pa.array(take_indices, type=pa.int64()))
+
+    def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
+
+        if self.get_config_value("array_mode"):
+            outputs.text = self.process_array(inputs.text)
         else:
-            outputs.text = repl_map[text]
+            outputs.text = self.replace(inputs.text)
+
+    def process_array(
+        self, array: typing.Union["pa.Array", "pa.ChunkedArray"]
+    ) -> typing.Union["pa.Array", "pa.ChunkedArray"]:
+        """Replace every item of a string array (or dictionary-encoded string array)."""
+
+        import pyarrow as pa
+
+        if isinstance(array, pa.ChunkedArray):
+            chunks = [self.process_array(chunk) for chunk in array.chunks]
+            if not chunks:
+                return array
+            return pa.chunked_array(chunks, type=chunks[0].type)
+
+        if pa.types.is_dictionary(array.type):
+            return pa.DictionaryArray.from_arrays(
+                array.indices, self.replace_values(array.dictionary)
+            )
+
+        return self.replace_values(array)
@@ -1,5 +1,4 @@
 # -*- coding: utf-8 -*-
-import pyarrow as pa
 import typing
 from pydantic import Field, validator
 
@@ -9,6 +8,37 @@ from kiara.data.types.files import FileBundleModel, FileModel
 from kiara.data.values import ValueSchema
 from kiara.exceptions import KiaraProcessingException
 from kiara.module import StepInputs, StepOutputs
+from kiara_modules.default.data_onboarding import (
+    read_archive_text_contents,
+    split_archive_member_path,
+)
+from kiara_modules.default.instrumentation import instrumented
+
+if typing.TYPE_CHECKING:
+    import pyarrow as pa
+
+ARROW_FILE_MAGIC = b"ARROW1"
+
+
+def read_table_file(path: str) -> "pa.Table":
+    """Read a csv or Arrow IPC file through a memory map.
+
+    Arrow files are read without copying, the resulting table references the mapped file directly. Raises a
+    'KiaraProcessingException' if the file is empty or can't be parsed.
+    """
+
+    import pyarrow as pa
+    from pyarrow import csv
+
+    try:
+        with pa.memory_map(path, "r") as source:
+            if source.read(len(ARROW_FILE_MAGIC)) == ARROW_FILE_MAGIC:
+                source.seek(0)
+                return pa.ipc.open_file(source).read_all()
+            source.seek(0)
+            return csv.read_csv(source)
+    except pa.ArrowInvalid as e:
+        raise KiaraProcessingException(f"Can't create table from file '{path}': {e}")
 
 
 class CreateTableModuleConfig(KiaraModuleConfig):
@@ -18,11 +48,20 @@ class CreateTableModuleConfig(KiaraModuleConfig):
     )
 
 
+@instrumented
 class CreateTableFromFileModule(KiaraModule):
-    """Import table-like data from an item in the data registry."""
+    """Import table-like data (csv or Arrow files) from an item in the data registry.
+
+    Files are read through a memory map, Arrow files without copying their content.
+    """
 
     _config_cls = CreateTableModuleConfig
 
+    @classmethod
+    def is_deterministic(cls) -> bool:
+        """Check whether this module type is deterministic (its outputs only depend on its inputs and config)."""
+        return True
+
     def create_input_schema(
         self,
     ) -> typing.Mapping[
@@ -58,7 +97,7 @@ class CreateTableFromFileModule(KiaraModule):
 
         input_file: FileModel = inputs.file
 
-        imported_data = pa.csv.read_csv(input_file.path)
+        imported_data = read_table_file(input_file.path)
 
         if self.get_config_value("allow_column_filter"):
             if self.get_config_value("columns"):
@@ -84,6 +123,41 @@ AVAILABLE_FILE_COLUMNS = [
 DEFAULT_COLUMNS = ["id", "rel_path", "content"]
 
 
+def read_text_file_contents(bundle: FileBundleModel) -> typing.Dict[str, str]:
+    """Read the content of all files in a bundle, as text.
+
+    Bundle entries that share their data (e.g. files with identical content in a deduplicated import) are only read
+    once. Entries that reference archive members are read directly from their archive, without extracting it.
+    """
+
+    paths: typing.Dict[str, typing.List[str]] = {}
+    archive_members: typing.Dict[str, typing.Dict[str, typing.List[str]]] = {}
+    for rel_path, file_model in bundle.included_files.items():
+        archive_member = split_archive_member_path(file_model.orig_path)
+        if archive_member is not None:
+            archive_path, member = archive_member
+            archive_members.setdefault(archive_path, {}).setdefault(member, []).append(
+                rel_path
+            )
+        else:
+            paths.setdefault(file_model.path, []).append(rel_path)
+
+    result: typing.Dict[str, str] = {}
+    for path, rel_paths in paths.items():
+        with open(path, encoding="utf-8") as f:
+            content = f.read()
+        for rel_path in rel_paths:
+            result[rel_path] = content
+
+    for archive_path, members in archive_members.items():
+        contents = read_archive_text_contents(archive_path, members.keys())
+        for member, rel_paths in members.items():
+            for rel_path in rel_paths:
+                result[rel_path] = contents[member]
+
+    return result
+
+
 class CreateTableFromTextFilesConfig(KiaraModuleConfig):
 
     columns: typing.List[str] = Field(
@@ -113,6 +187,7 @@ class CreateTableFromTextFilesConfig(KiaraModuleConfig):
         return v
 
 
+@instrumented
 class CreateTableFromTextFilesModule(KiaraModule):
 
     _config_cls = CreateTableFromTextFilesConfig
@@ -149,19 +224,21 @@ class CreateTableFromTextFilesModule(KiaraModule):
 
     def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
 
+        import pyarrow as pa
+
         bundle: FileBundleModel = inputs.files
 
         columns = self.get_config_value("columns")
         if not columns:
             columns = DEFAULT_COLUMNS
 
+        file_dict: typing.Mapping[str, typing.Optional[str]]
         if "content" in columns:
-            file_dict = bundle.read_text_file_contents()
+            file_dict = read_text_file_contents(bundle)
         else:
-            file_dict = {}
-            for rel_path in bundle.included_files.keys():
-                file_dict[rel_path] = None  # type: ignore
+            file_dict = {rel_path: None for rel_path in bundle.included_files.keys()}
 
+        value: typing.Any
         tabular: typing.Dict[str, typing.List[typing.Any]] = {}
         for column in columns:
             for index, rel_path in enumerate(sorted(file_dict.keys())):
@@ -183,6 +260,7 @@ class CreateTableFromTextFilesModule(KiaraModule):
         outputs.table = table
 
 
+@instrumented
 class MergeTableModule(KiaraModule):
     def create_input_schema(
         self,
@@ -211,6 +289,8 @@ class MergeTableModule(KiaraModule):
 
     def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
 
+        import pyarrow as pa
+
         sources = inputs.sources
 
         len_dict = {}
@@ -225,7 +305,7 @@ class MergeTableModule(KiaraModule):
                     arrays.append(column)
                     column_names.append(name)
 
-            elif isinstance(table_or_column, pa.Array):
+            elif isinstance(table_or_column, (pa.Array, pa.ChunkedArray)):
                 rows = len(table_or_column)
                 arrays.append(table_or_column)
                 column_names.append(source_key)
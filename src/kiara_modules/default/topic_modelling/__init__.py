@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+import collections
+import functools
+import os
+import re
+import typing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pydantic import Field, validator
+
+from kiara import KiaraModule
+from kiara.config import KiaraModuleConfig
+from kiara.data.values import ValueSchema
+from kiara.exceptions import KiaraProcessingException
+from kiara.module import StepInputs, StepOutputs
+from kiara_modules.default.instrumentation import instrumented
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+    import pyarrow as pa
+
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+
+def tokenize_documents(
+    documents: typing.Iterable[typing.Optional[str]],
+    token_pattern: str = DEFAULT_TOKEN_PATTERN,
+    lowercase: bool = True,
+    stop_words: typing.FrozenSet[str] = frozenset(),
+) -> typing.Tuple[
+    typing.List[str], "np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"
+]:
+    """Tokenize a batch of documents, and count the tokens of every document.
+
+    Returns the terms of the batch, and a sparse (CSR) document-term matrix for the batch, with column indices that refer
+    to the returned terms: row offsets, column indices, counts. Also returns the total count of each term. Null
+    documents result in empty rows.
+    """
+
+    import numpy as np
+
+    findall = re.compile(token_pattern).findall
+
+    terms: typing.Dict[str, int] = {}
+    get_term_id = terms.setdefault
+    indptr = [0]
+    indices: typing.List[int] = []
+    counts: typing.List[int] = []
+    for document in documents:
+        if document:
+            if lowercase:
+                document = document.lower()
+            tokens = collections.Counter(findall(document))
+            for stop_word in stop_words.intersection(tokens.keys()):
+                del tokens[stop_word]
+            for term, count in tokens.items():
+                indices.append(get_term_id(term, len(terms)))
+                counts.append(count)
+        indptr.append(len(indices))
+
+    _indices = np.array(indices, dtype=np.int64)
+    _counts = np.array(counts, dtype=np.int64)
+    term_frequencies = np.bincount(_indices, weights=_counts, minlength=len(terms))
+
+    return (
+        list(terms.keys()),
+        np.array(indptr, dtype=np.int64),
+        _indices,
+        _counts,
+        term_frequencies.astype(np.int64),
+    )
+
+
+def to_csr_matrix(document_term_matrix: "pa.Table", vocabulary_size: int) -> typing.Any:
+    """Convert a document-term matrix table into a 'scipy.sparse.csr_matrix'.
+
+    The term ids and counts are not copied, unless the table consists of several chunks (which are concatenated).
+    Requires *scipy* (install the 'topic_modelling' extra), a 'KiaraProcessingException' is raised if it's missing.
+    """
+
+    import pyarrow as pa
+
+    try:
+        from scipy.sparse import csr_matrix
+    except ImportError:
+        raise KiaraProcessingException(
+            "Can't convert document-term matrix: 'scipy' is not installed (install 'kiara_modules.default[topic_modelling]')."
+        )
+
+    term_ids = document_term_matrix.column("term_ids")
+    counts = document_term_matrix.column("counts")
+    if term_ids.num_chunks == 0:
+        return csr_matrix((0, vocabulary_size), dtype="int32")
+
+    if term_ids.num_chunks == 1:
+        term_ids = term_ids.chunk(0)
+        counts = counts.chunk(0)
+    else:
+        term_ids = pa.concat_arrays(term_ids.chunks)
+        counts = pa.concat_arrays(counts.chunks)
+
+    offsets = term_ids.offsets.to_numpy()
+    indices = term_ids.flatten().to_numpy()
+    data = counts.flatten().to_numpy()
+    return csr_matrix(
+        (data, indices, offsets - offsets[0]),
+        shape=(len(term_ids), vocabulary_size),
+    )
+
+
+def _iter_results(
+    func: typing.Callable[[typing.List[typing.Optional[str]]], typing.Any],
+    batches: typing.Iterable[typing.List[typing.Optional[str]]],
+    executor: typing.Optional[Executor],
+    max_pending: int,
+) -> typing.Iterator[typing.Any]:
+    """Apply a function to every batch, and yield the results in order.
+
+    If an executor is provided, no more than 'max_pending' batches are submitted at any time, so only a few batches are
+    held in memory.
+    """
+
+    if executor is None:
+        for batch in batches:
+            yield func(batch)
+        return
+
+    pending: typing.Deque = collections.deque()
+    for batch in batches:
+        pending.append(executor.submit(func, batch))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class CreateDocumentTermMatrixConfig(KiaraModuleConfig):
+
+    column: str = Field(
+        description="The name of the column that contains the document texts.",
+        default="content",
+    )
+    token_pattern: str = Field(
+        description="The regular expression that matches a token.",
+        default=DEFAULT_TOKEN_PATTERN,
+    )
+    lowercase: bool = Field(
+        description="Whether to convert the texts to lowercase before tokenizing.",
+        default=True,
+    )
+    stop_words: typing.List[str] = Field(
+        description="A list of tokens to ignore.", default_factory=list
+    )
+    min_document_frequency: int = Field(
+        description="Only include terms that appear in at least this many documents.",
+        default=1,
+    )
+    max_document_frequency: float = Field(
+        description="Only include terms that appear in at most this proportion of all documents (between 0.0 and 1.0).",
+        default=1.0,
+    )
+    max_vocabulary_size: typing.Optional[int] = Field(
+        description="Only include this many terms (the ones that appear in the most documents), after the document frequency limits are applied.",
+        default=None,
+    )
+    batch_size: int = Field(
+        description="The number of documents that are tokenized at a time (and sent to a parallel worker).",
+        default=10000,
+    )
+    executor: typing.Optional[str] = Field(
+        description="Whether to tokenize the batches in parallel, in a pool of threads ('thread') or processes ('process'). By default, batches are tokenized serially.",
+        default=None,
+    )
+    workers: typing.Optional[int] = Field(
+        description="The number of parallel workers (defaults to the number of CPUs).",
+        default=None,
+    )
+
+    @validator("executor")
+    def _validate_executor(cls, v):
+
+        allowed = ["thread", "process"]
+        if v is not None and v not in allowed:
+            raise ValueError(f"'executor' must be one of: [{allowed}]")
+        return v
+
+    @validator("workers", "batch_size", "min_document_frequency", "max_vocabulary_size")
+    def _validate_positive(cls, v):
+
+        if v is not None and v < 1:
+            raise ValueError("Value must be a positive integer.")
+        return v
+
+    @validator("max_document_frequency")
+    def _validate_proportion(cls, v):
+
+        if v <= 0.0 or v > 1.0:
+            raise ValueError("Value must be larger than 0.0, and not larger than 1.0.")
+        return v
+
+
+@instrumented
+class CreateDocumentTermMatrixModule(KiaraModule):
+    """Tokenize the texts in a table column, and create a sparse document-term (bag-of-words) matrix and a vocabulary.
+
+    The texts are tokenized in batches (optionally in parallel), so only the terms and the sparse token counts of the
+    corpus are held in memory, never the tokens of all documents. Terms that appear in too few or too many documents are
+    pruned from the vocabulary afterwards.
+
+    The document-term matrix is a table with one row per input row (in the same order), with the ids of the terms of that
+    document ('term_ids') and how often they appear in it ('counts'). Those list columns are the column indices and the
+    values of a CSR matrix, the list offsets are its row pointers, so it can be converted into a sparse matrix without
+    copying (see [to_csr_matrix][kiara_modules.default.topic_modelling.to_csr_matrix]). The vocabulary table contains
+    every term with its id, in which (and how many) documents it appears, and its total count.
+    """
+
+    _config_cls = CreateDocumentTermMatrixConfig
+
+    def create_input_schema(
+        self,
+    ) -> typing.Mapping[
+        str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
+    ]:
+
+        return {
+            "table": {
+                "type": "table",
+                "doc": f"The table that contains the documents (in the '{self.get_config_value('column')}' column).",
+            }
+        }
+
+    def create_output_schema(
+        self,
+    ) -> typing.Mapping[
+        str, typing.Union[ValueSchema, typing.Mapping[str, typing.Any]]
+    ]:
+
+        return {
+            "document_term_matrix": {
+                "type": "table",
+                "doc": "The term ids and counts for every document.",
+            },
+            "vocabulary": {
+                "type": "table",
+                "doc": "The terms, with their id, document frequency and total count.",
+            },
+        }
+
+    def process(self, inputs: StepInputs, outputs: StepOutputs) -> None:
+
+        import numpy as np
+        import pyarrow as pa
+
+        table: pa.Table = inputs.table
+        column_name = self.get_config_value("column")
+        if column_name not in table.column_names:
+            raise KiaraProcessingException(
+                f"Can't create document-term matrix: no column '{column_name}' in table. Available columns: {', '.join(table.column_names)}"
+            )
+
+        column = table.column(column_name)
+        batch_size = self.get_config_value("batch_size")
+        batches = (
+            column.slice(offset, batch_size).to_pylist()
+            for offset in range(0, len(column), batch_size)
+        )
+
+        tokenize = functools.partial(
+            tokenize_documents,
+            token_pattern=self.get_config_value("token_pattern"),
+            lowercase=self.get_config_value("lowercase"),
+            stop_words=frozenset(self.get_config_value("stop_words")),
+        )
+
+        executor_type = self.get_config_value("executor")
+        workers = self.get_config_value("workers") or os.cpu_count() or 1
+        executor: typing.Optional[Executor] = None
+        if executor_type == "process":
+            executor = ProcessPoolExecutor(max_workers=workers)
+        elif executor_type == "thread":
+            executor = ThreadPoolExecutor(max_workers=workers)
+
+        # terms get a preliminary id when they are first seen, the final ids are assigned after pruning
+        vocabulary: typing.Dict[str, int] = {}
+        document_frequencies = np.zeros(1024, dtype=np.int64)
+        term_frequencies = np.zeros(1024, dtype=np.int64)
+        rows: typing.List[typing.Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+
+        try:
+            for terms, indptr, indices, counts, batch_term_frequencies in _iter_results(
+                tokenize, batches, executor, max_pending=workers * 2
+            ):
+                term_ids = np.fromiter(
+                    (vocabulary.setdefault(term, len(vocabulary)) for term in terms),
+                    dtype=np.int64,
+                    count=len(terms),
+                )
+                if len(vocabulary) > len(document_frequencies):
+                    size = max(len(vocabulary), len(document_frequencies) * 2)
+                    document_frequencies.resize(size, refcheck=False)
+                    term_frequencies.resize(size, refcheck=False)
+
+                document_frequencies[term_ids] += np.bincount(
+                    indices, minlength=len(terms)
+                )
+                term_frequencies[term_ids] += batch_term_frequencies
+                rows.append((indptr, term_ids[indices], counts))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        number_of_documents = len(column)
+        document_frequencies = document_frequencies[: len(vocabulary)]
+        term_frequencies = term_frequencies[: len(vocabulary)]
+        all_terms = np.array(list(vocabulary.keys()), dtype=object)
+        del vocabulary
+
+        keep = document_frequencies >= self.get_config_value("min_document_frequency")
+        keep &= document_frequencies <= self.get_config_value(
+            "max_document_frequency"
+        ) * max(number_of_documents, 1)
+        kept = np.flatnonzero(keep)
+
+        max_vocabulary_size = self.get_config_value("max_vocabulary_size")
+        if max_vocabulary_size is not None and len(kept) > max_vocabulary_size:
+            # most frequent first, ties are decided by the term
+            order = np.lexsort((all_terms[kept], -document_frequencies[kept]))
+            kept = kept[order[:max_vocabulary_size]]
+
+        kept = kept[np.argsort(all_terms[kept], kind="stable")]
+        final_ids = np.full(len(all_terms), -1, dtype=np.int32)
+        final_ids[kept] = np.arange(len(kept), dtype=np.int32)
+
+        batches_out = [
+            self._create_matrix_batch(final_ids, *batch_rows) for batch_rows in rows
+        ]
+        schema = pa.schema(
+            [
+                pa.field("term_ids", pa.list_(pa.int32())),
+                pa.field("counts", pa.list_(pa.int32())),
+            ]
+        )
+        outputs.document_term_matrix = pa.Table.from_batches(batches_out, schema=schema)
+        outputs.vocabulary = pa.table(
+            {
+                "id": pa.array(np.arange(len(kept), dtype=np.int32)),
+                "term": pa.array(all_terms[kept].tolist(), type=pa.string()),
+                "document_frequency": pa.array(document_frequencies[kept]),
+                "term_frequency": pa.array(term_frequencies[kept]),
+            }
+        )
+
+    def _create_matrix_batch(
+        self,
+        final_ids: "np.ndarray",
+        indptr: "np.ndarray",
+        term_ids: "np.ndarray",
+        counts: "np.ndarray",
+    ) -> "pa.RecordBatch":
+        """Map the preliminary term ids of a batch to the final ones, and drop pruned terms (sorted by id per row)."""
+
+        import numpy as np
+        import pyarrow as pa
+
+        number_of_rows = len(indptr) - 1
+        row_ids = np.repeat(np.arange(number_of_rows), np.diff(indptr))
+
+        ids = final_ids[term_ids]
+        keep = ids >= 0
+        row_ids = row_ids[keep]
+        ids = ids[keep]
+        counts = counts[keep]
+
+        order = np.lexsort((ids, row_ids))
+        offsets = np.zeros(number_of_rows + 1, dtype=np.int32)
+        np.cumsum(np.bincount(row_ids, minlength=number_of_rows), out=offsets[1:])
+
+        offsets_array = pa.array(offsets)
+        return pa.RecordBatch.from_arrays(
+            [
+                pa.ListArray.from_arrays(offsets_array, pa.array(ids[order])),
+                pa.ListArray.from_arrays(
+                    offsets_array, pa.array(counts[order].astype(np.int32))
+                ),
+            ],
+            names=["term_ids", "counts"],
+        )
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+"""Synthetic data for the scaling benchmarks, in configurable size tiers.
+
+Which size tiers are used is controlled by the ``KIARA_BENCHMARK_TIERS`` environment variable (a comma-separated list,
+default: 'small').
+"""
+
+import os
+import pyarrow as pa
+import random
+import tarfile
+import typing
+from pyarrow import csv
+
+if typing.TYPE_CHECKING:
+    from kiara import Kiara
+
+SIZE_TIERS: typing.Dict[str, typing.Dict[str, int]] = {
+    "small": {"rows": 1000, "files": 100, "nodes": 100, "edges": 500},
+    "medium": {"rows": 10000, "files": 1000, "nodes": 1000, "edges": 5000},
+    "large": {"rows": 100000, "files": 10000, "nodes": 10000, "edges": 50000},
+    "xlarge": {"rows": 1000000, "files": 100000, "nodes": 100000, "edges": 500000},
+}
+
+WORDS = [
+    "il",
+    "lavoro",
+    "giornale",
+    "operai",
+    "sovversiva",
+    "cronaca",
+    "della",
+    "libertà",
+    "sciopero",
+    "compagni",
+    "anarchia",
+    "società",
+]
+
+LENA_COLUMNS = [
+    "Id",
+    "Label",
+    "Year",
+    "Type",
+    "Language",
+    "City",
+    "CountryOld",
+    "CountryNew",
+    "Latitude",
+    "Longitude",
+    "Edition",
+]
+
+
+def get_tiers() -> typing.List[str]:
+
+    tiers = os.environ.get("KIARA_BENCHMARK_TIERS", "small")
+    result = []
+    for tier in tiers.split(","):
+        tier = tier.strip()
+        if tier not in SIZE_TIERS.keys():
+            raise ValueError(
+                f"Invalid benchmark tier '{tier}', available: {', '.join(SIZE_TIERS.keys())}"
+            )
+        result.append(tier)
+    return result
+
+
+def create_file_names(count: int, seed: int = 0) -> typing.List[str]:
+    """Create file names like the ones in the topic modelling corpus (publication reference, date, edition)."""
+
+    rnd = random.Random(seed)
+    refs = [f"sn{rnd.randint(10000000, 99999999)}" for _ in range(20)]
+    file_names = []
+    for index in range(count):
+        ref = rnd.choice(refs)
+        date = f"{rnd.randint(1880, 1930)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}"
+        file_names.append(f"{ref}_{date}_ed-{index}_seq-1_ocr.txt")
+    return file_names
+
+
+def create_text(words: int, rnd: random.Random) -> str:
+
+    return " ".join(rnd.choice(WORDS) for _ in range(words))
+
+
+def create_text_corpus(folder: str, files: int, seed: int = 0) -> str:
+    """Create a folder with text files (in a few sub-folders), and return its path."""
+
+    rnd = random.Random(seed)
+    for index, file_name in enumerate(create_file_names(files, seed=seed)):
+        sub_folder = os.path.join(folder, f"batch_{index % 10}")
+        os.makedirs(sub_folder, exist_ok=True)
+        with open(os.path.join(sub_folder, file_name), "w", encoding="utf-8") as f:
+            f.write(create_text(rnd.randint(50, 500), rnd))
+    return folder
+
+
+def create_graph_files(folder: str, nodes: int, edges: int, seed: int = 0):
+    """Create an edges and a nodes csv file for a random graph, and return both paths."""
+
+    from kiara_modules.default.dev import create_synthetic_graph
+
+    graph = create_synthetic_graph(nodes, edges, seed=seed)
+
+    edges_path = os.path.join(folder, "edges.csv")
+    with open(edges_path, "w", encoding="utf-8") as f:
+        f.write("source,target,weight\n")
+        for index, (source, target) in enumerate(graph.edges):
+            f.write(f"{source},{target},{index % 10 + 1}\n")
+
+    nodes_path = os.path.join(folder, "nodes.csv")
+    with open(nodes_path, "w", encoding="utf-8") as f:
+        f.write("id,label,group\n")
+        for node in graph.nodes:
+            f.write(f"{node},node_{node},group_{node % 7}\n")
+
+    return edges_path, nodes_path
+
+
+class BenchmarkData(object):
+    """Lazily created synthetic data for one size tier."""
+
+    def __init__(self, tier: str, kiara: "Kiara", base_folder: str):
+
+        self.tier: str = tier
+        self.sizes: typing.Mapping[str, int] = SIZE_TIERS[tier]
+        self._kiara: "Kiara" = kiara
+        self._base_folder: str = base_folder
+        self._cache: typing.Dict[str, typing.Any] = {}
+
+    def _get(self, key: str, create: typing.Callable[[], typing.Any]) -> typing.Any:
+
+        if key not in self._cache.keys():
+            self._cache[key] = create()
+        return self._cache[key]
+
+    def folder(self, name: str) -> str:
+
+        path = os.path.join(self._base_folder, self.tier, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def run_module(
+        self,
+        module_type: str,
+        module_config: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+        **inputs: typing.Any,
+    ) -> typing.Any:
+
+        module = self._kiara.create_module(
+            f"prepare_{module_type}", module_type, module_config=module_config
+        )
+        return module.run(**inputs)
+
+    @property
+    def table(self) -> pa.Table:
+        from kiara_modules.default.dev import create_synthetic_table
+
+        return self._get(
+            "table", lambda: create_synthetic_table(self.sizes["rows"], 10)
+        )
+
+    @property
+    def file_names(self) -> pa.Array:
+        return self._get(
+            "file_names", lambda: pa.array(create_file_names(self.sizes["rows"]))
+        )
+
+    @property
+    def booleans(self) -> typing.Tuple[pa.Array, pa.Array]:
+        def create():
+            rnd = random.Random(0)
+            return tuple(
+                pa.array([rnd.random() < 0.5 for _ in range(self.sizes["rows"])])
+                for _ in range(2)
+            )
+
+        return self._get("booleans", create)
+
+    @property
+    def corpus_folder(self) -> str:
+        return self._get(
+            "corpus_folder",
+            lambda: create_text_corpus(self.folder("corpus"), self.sizes["files"]),
+        )
+
+    @property
+    def corpus_archive(self) -> str:
+        def create():
+            path = os.path.join(self.folder("archives"), "corpus.tar.gz")
+            with tarfile.open(path, "w:gz") as tf:
+                tf.add(self.corpus_folder, arcname="corpus")
+            return path
+
+        return self._get("corpus_archive", create)
+
+    @property
+    def file_bundle(self) -> typing.Any:
+        return self._get(
+            "file_bundle",
+            lambda: self.run_module("import_local_folder", path=self.corpus_folder)[
+                "file_bundle"
+            ],
+        )
+
+    @property
+    def text_table(self) -> pa.Table:
+        return self._get(
+            "text_table",
+            lambda: self.run_module(
+                "create_table_from_text_files", files=self.file_bundle
+            )["table"],
+        )
+
+    @property
+    def graph_files(self) -> typing.Tuple[str, str]:
+        return self._get(
+            "graph_files",
+            lambda: create_graph_files(
+                self.folder("graph"), self.sizes["nodes"], self.sizes["edges"]
+            ),
+        )
+
+    @property
+    def edges_file(self) -> typing.Any:
+        return self._get(
+            "edges_file",
+            lambda: self.run_module("import_local_file", path=self.graph_files[0])[
+                "file"
+            ],
+        )
+
+    @property
+    def edges_table(self) -> pa.Table:
+        return self._get(
+            "edges_table",
+            lambda: csv.read_csv(self.graph_files[0]),
+        )
+
+    @property
+    def nodes_table(self) -> pa.Table:
+        return self._get(
+            "nodes_table",
+            lambda: csv.read_csv(self.graph_files[1]),
+        )
+
+    @property
+    def journals_table(self) -> pa.Table:
+        """A table in the (source journal, target journal) format the 'prepare_nodes_table_lena' module expects."""
+
+        def create():
+            rnd = random.Random(0)
+            columns: typing.Dict[str, typing.List[typing.Any]] = {}
+            for prefix in ["Source", "Target"]:
+                ids = [
+                    rnd.randrange(self.sizes["nodes"])
+                    for _ in range(self.sizes["edges"])
+                ]
+                columns[f"{prefix}Id"] = ids
+                for field in LENA_COLUMNS[1:]:
+                    columns[f"{prefix}{field}"] = [f"{field}_{i}" for i in ids]
+            return pa.Table.from_pydict(columns)
+
+        return self._get("journals_table", create)
+
+    @property
+    def graph(self) -> typing.Any:
+        from kiara_modules.default.dev import create_synthetic_graph
+
+        return self._get(
+            "graph",
+            lambda: create_synthetic_graph(self.sizes["nodes"], self.sizes["edges"]),
+        )
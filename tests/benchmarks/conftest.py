@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Fixtures for the scaling benchmarks.
+
+The benchmarks need *kiara* and *pytest-benchmark*, and are skipped if either is not installed. The size tiers to
+run are configured in the ``KIARA_BENCHMARK_TIERS`` environment variable (see ``benchmark_data``).
+
+Timings are recorded (and compared against stored runs) by *pytest-benchmark* (``--benchmark-autosave``,
+``--benchmark-compare``, ``--benchmark-compare-fail``). Peak memory is recorded for every benchmark as well, and compared
+against the baseline file in ``KIARA_BENCHMARK_MEMORY_BASELINE`` (if set). Set ``KIARA_BENCHMARK_SAVE_MEMORY_BASELINE``
+to write the peak memory of the current run to that file.
+"""
+
+import pytest  # noqa
+
+import json
+import os
+import pyarrow as pa
+import tracemalloc
+import typing
+
+from benchmark_data import BenchmarkData, get_tiers
+
+if typing.TYPE_CHECKING:
+    from kiara import Kiara
+
+MEMORY_REGRESSION_TOLERANCE = 0.2
+
+
+@pytest.fixture(scope="session")
+def kiara() -> "Kiara":
+
+    from kiara import Kiara
+
+    return Kiara.instance()
+
+
+@pytest.fixture(scope="session")
+def benchmark_data(kiara, tmp_path_factory) -> typing.Dict[str, BenchmarkData]:
+
+    base_folder = str(tmp_path_factory.mktemp("benchmark_data"))
+    return {tier: BenchmarkData(tier, kiara, base_folder) for tier in get_tiers()}
+
+
+@pytest.fixture(scope="session")
+def memory_baseline() -> typing.Iterator[typing.Dict[str, typing.Dict[str, int]]]:
+    """The stored peak memory baseline (if configured), also used to collect the peak memory of the current run."""
+
+    baseline: typing.Dict[str, typing.Dict[str, int]] = {}
+    baseline_path = os.environ.get("KIARA_BENCHMARK_MEMORY_BASELINE", None)
+    if baseline_path and os.path.isfile(baseline_path):
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    current: typing.Dict[str, typing.Dict[str, int]] = {}
+    yield {"baseline": baseline, "current": current}  # type: ignore
+
+    save_path = os.environ.get("KIARA_BENCHMARK_SAVE_MEMORY_BASELINE", None)
+    if save_path:
+        merged = dict(baseline)
+        merged.update(current)
+        with open(save_path, "w", encoding="utf-8") as f:
+            json.dump(merged, f, indent=2, sort_keys=True)
+
+
+def measure_peak_memory(func: typing.Callable[[], typing.Any]) -> typing.Dict[str, int]:
+    """Run a function once, and return the peak memory allocated by Python and by the Arrow memory pool."""
+
+    pool = pa.default_memory_pool()
+    arrow_before = pool.bytes_allocated()
+    arrow_max_before = pool.max_memory()
+
+    tracemalloc.start()
+    try:
+        func()
+        _, python_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # the Arrow pool only tracks its all-time peak, so this is only accurate if the peak was reached during this run
+    arrow_peak = max(pool.max_memory() - arrow_max_before, 0)
+    arrow_retained = max(pool.bytes_allocated() - arrow_before, 0)
+
+    return {
+        "python_peak_bytes": python_peak,
+        "arrow_peak_bytes": max(arrow_peak, arrow_retained),
+    }
+
+
+@pytest.fixture
+def run_benchmark(benchmark, memory_baseline, request):
+    """Benchmark a function (time via pytest-benchmark, plus peak memory), and check it against the memory baseline."""
+
+    def run(func: typing.Callable[[], typing.Any], rounds: int = 3) -> typing.Any:
+
+        memory = measure_peak_memory(func)
+        benchmark.extra_info.update(memory)
+
+        test_id = request.node.name
+        memory_baseline["current"][test_id] = memory
+
+        result = benchmark.pedantic(func, rounds=rounds, iterations=1)
+
+        baseline = memory_baseline["baseline"].get(test_id, None)
+        if baseline:
+            for key, value in memory.items():
+                limit = baseline.get(key, 0) * (1 + MEMORY_REGRESSION_TOLERANCE)
+                if baseline.get(key, 0) and value > limit:
+                    pytest.fail(
+                        f"Memory regression for '{test_id}': {key} is {value}, baseline is {baseline[key]}."
+                    )
+
+        return result
+
+    return run
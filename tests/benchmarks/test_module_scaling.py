@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""Scaling benchmarks for all modules and bundled pipelines.
+
+Every module (and pipeline) is run against synthetic inputs for each of the configured size tiers. The
+'import_network_graph' pipeline is not included, because it references a 'create_table' module type that is not
+available in this package.
+"""
+
+import pytest  # noqa
+
+import typing
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("kiara")
+
+import pyarrow.compute as pc  # noqa: E402
+
+from benchmark_data import LENA_COLUMNS, BenchmarkData, get_tiers  # noqa: E402
+
+BenchmarkCase = typing.Tuple[
+    str,
+    typing.Optional[typing.Mapping[str, typing.Any]],
+    typing.Mapping[str, typing.Any],
+]
+
+DATE_REGEX = r"_(\d{4}-\d{2}-\d{2})_"
+REF_REGEX = r"(sn\d+)_"
+
+
+def _dummy_case(data: BenchmarkData) -> BenchmarkCase:
+
+    config = {
+        "input_schema": {"table": {"type": "table"}},
+        "output_schema": {"table": {"type": "table"}},
+        "synthetic_outputs": {"table": {"rows": data.sizes["rows"]}},
+    }
+    return ("dummy", config, {"table": data.table})
+
+
+CASES: typing.Dict[str, typing.Callable[[BenchmarkData], BenchmarkCase]] = {
+    # logic gates
+    "and": lambda data: (
+        "and",
+        {"array_mode": True},
+        {"a": data.booleans[0], "b": data.booleans[1]},
+    ),
+    "or": lambda data: (
+        "or",
+        {"array_mode": True},
+        {"a": data.booleans[0], "b": data.booleans[1]},
+    ),
+    "not": lambda data: ("not", {"array_mode": True}, {"a": data.booleans[0]}),
+    "xor": lambda data: ("xor", None, {"a": True, "b": False}),
+    "nand": lambda data: ("nand", None, {"a": True, "b": True}),
+    "nor": lambda data: ("nor", None, {"a": False, "b": False}),
+    "xor_array": lambda data: (
+        "xor_array",
+        None,
+        {"a": data.booleans[0], "b": data.booleans[1]},
+    ),
+    "nand_array": lambda data: (
+        "nand_array",
+        None,
+        {"a": data.booleans[0], "b": data.booleans[1]},
+    ),
+    "nor_array": lambda data: (
+        "nor_array",
+        None,
+        {"a": data.booleans[0], "b": data.booleans[1]},
+    ),
+    "fused_pipeline": lambda data: (
+        "fused_pipeline",
+        {"pipeline": "xor_array"},
+        {"a": data.booleans[0], "b": data.booleans[1]},
+    ),
+    "dummy": _dummy_case,
+    # onboarding
+    "import_local_file": lambda data: (
+        "import_local_file",
+        None,
+        {"path": data.graph_files[0]},
+    ),
+    "import_local_folder": lambda data: (
+        "import_local_folder",
+        None,
+        {"path": data.corpus_folder},
+    ),
+    "import_local_archive": lambda data: (
+        "import_local_archive",
+        None,
+        {"path": data.corpus_archive},
+    ),
+    # tables
+    "create_table_from_file": lambda data: (
+        "create_table_from_file",
+        None,
+        {"file": data.edges_file},
+    ),
+    "create_table_from_text_files": lambda data: (
+        "create_table_from_text_files",
+        None,
+        {"files": data.file_bundle},
+    ),
+    "import_table_from_folder": lambda data: (
+        "import_table_from_folder",
+        None,
+        {"read_files_in_folder__path": data.corpus_folder},
+    ),
+    "create_document_term_matrix": lambda data: (
+        "create_document_term_matrix",
+        {"min_document_frequency": 2},
+        {"table": data.text_table},
+    ),
+    "merge_table": lambda data: (
+        "merge_table",
+        None,
+        {"sources": {"table": data.table, "file_name": data.file_names}},
+    ),
+    "prepare_nodes_table_lena": lambda data: (
+        "prepare_nodes_table_lena",
+        None,
+        {"table": data.journals_table},
+    ),
+    "extract_nodes_table": lambda data: (
+        "extract_nodes_table",
+        {
+            "column_groups": [
+                {c: f"{prefix}{c}" for c in LENA_COLUMNS}
+                for prefix in ["Source", "Target"]
+            ],
+            "index_column_name": "Id",
+        },
+        {"table": data.journals_table},
+    ),
+    # network analysis
+    "create_graph_from_edges_table": lambda data: (
+        "create_graph_from_edges_table",
+        None,
+        {"edges_table": data.edges_table},
+    ),
+    "augment_network_graph": lambda data: (
+        "augment_network_graph",
+        None,
+        {
+            "graph": data.graph,
+            "node_attributes": data.nodes_table,
+            "index_column_name": "id",
+        },
+    ),
+    "add_nodes_to_network_graph": lambda data: (
+        "add_nodes_to_network_graph",
+        None,
+        {"graph": data.graph, "nodes": data.nodes_table, "index_column_name": "id"},
+    ),
+    "find_shortest_path": lambda data: (
+        "find_shortest_path",
+        None,
+        {"graph": data.graph, "source_node": 0, "target_node": 1},
+    ),
+    "graph_properties": lambda data: ("graph_properties", None, {"graph": data.graph}),
+    "network_analysis": lambda data: (
+        "network_analysis",
+        None,
+        {
+            "graph": data.graph,
+            "shortest_path_source_node": 0,
+            "shortest_path_target_node": 1,
+        },
+    ),
+    # arrays & strings
+    "map": lambda data: (
+        "map",
+        {
+            "module_type": "match_regex",
+            "module_config": {"regex": REF_REGEX, "only_first_match": True},
+            "use_array_implementation": False,
+        },
+        {"array": data.file_names},
+    ),
+    "extract_date": lambda data: (
+        "extract_date",
+        {"array_mode": True},
+        {"text": data.file_names},
+    ),
+    "match_regex": lambda data: (
+        "match_regex",
+        {"regex": REF_REGEX, "only_first_match": True, "array_mode": True},
+        {"text": data.file_names},
+    ),
+    "extract_regex_columns": lambda data: (
+        "extract_regex_columns",
+        {
+            "extractors": {
+                "date": {"regex": DATE_REGEX, "type": "date"},
+                "ref": {"regex": REF_REGEX},
+            }
+        },
+        {"array": data.file_names},
+    ),
+    "replace_string": lambda data: (
+        "replace_string",
+        {
+            "replacement_map": {data.file_names[0].as_py()[:10]: "Publication A"},
+            "default_value": "unknown",
+            "array_mode": True,
+        },
+        {"text": pc.utf8_slice_codeunits(data.file_names, 0, 10)},
+    ),
+    "to_lowercase": lambda data: (
+        "to_lowercase",
+        {"array_mode": True},
+        {"text": data.file_names},
+    ),
+    "strip_whitespace": lambda data: (
+        "strip_whitespace",
+        {"array_mode": True},
+        {"text": data.file_names},
+    ),
+    "normalize_unicode": lambda data: (
+        "normalize_unicode",
+        {"array_mode": True},
+        {"text": data.file_names},
+    ),
+}
+
+
+@pytest.mark.parametrize("tier", get_tiers())
+@pytest.mark.parametrize("case", sorted(CASES.keys()))
+def test_module_scaling(kiara, benchmark_data, run_benchmark, case: str, tier: str):
+
+    data = benchmark_data[tier]
+    module_type, module_config, inputs = CASES[case](data)
+
+    module = kiara.create_module(
+        f"benchmark_{case}", module_type, module_config=module_config
+    )
+    run_benchmark(lambda: module.run(**inputs))
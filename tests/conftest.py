@@ -1,10 +1,46 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """
-    Dummy conftest.py for kiara_modules.default.
+Dummy conftest.py for kiara_modules.default.
 
-    If you don't know what this is for, just leave it empty.
-    Read more about conftest.py under:
-    https://pytest.org/latest/plugins.html
+If you don't know what this is for, just leave it empty.
+Read more about conftest.py under:
+https://pytest.org/latest/plugins.html
 """
-# import pytest
+
+import pytest
+
+
+class DummyValue(object):
+    def __init__(self, data):
+        self.data = data
+        self.is_set = True
+
+    def get_value_data(self):
+        return self.data
+
+
+class DummyValueSet(object):
+    """A minimal stand-in for kiara's value sets (step inputs and outputs), backed by a dict."""
+
+    def __init__(self, **values):
+        self.values = values
+
+    def get_all_field_names(self):
+        return list(self.values.keys())
+
+    def get_value_obj(self, field_name):
+        return DummyValue(self.values[field_name])
+
+    def get_value_data(self, field_name):
+        return self.values[field_name]
+
+    def set_values(self, **values):
+        self.values.update(values)
+
+
+@pytest.fixture
+def value_set():
+    """The class of a minimal value set, to create inputs and outputs for calling the 'process' method of a module."""
+
+    return DummyValueSet
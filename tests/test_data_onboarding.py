@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tests for the folder import functions in `kiara_modules.default.data_onboarding`."""
+
+import pytest  # noqa
+
+pytest.importorskip("kiara")
+
+from kiara.data.types.files import FileModel, FolderImportConfig  # noqa: E402
+
+from kiara_modules.default.data_onboarding import import_folder  # noqa: E402
+from kiara_modules.default.tabular_data import read_text_file_contents  # noqa: E402
+
+
+def _fail_import(*args, **kwargs):
+
+    raise AssertionError("File was imported (copied), but should be referenced.")
+
+
+def test_reference_only_import(tmp_path, monkeypatch):
+
+    folder = tmp_path / "corpus"
+    folder.mkdir()
+    for index in range(3):
+        (folder / f"file_{index}.txt").write_text(f"content {index}")
+
+    monkeypatch.setattr(FileModel, "import_file", _fail_import)
+
+    bundle = import_folder(str(folder), FolderImportConfig(), reference_only=True)
+
+    assert sorted(bundle.included_files.keys()) == [
+        f"file_{index}.txt" for index in range(3)
+    ]
+    for rel_path, file_model in bundle.included_files.items():
+        assert file_model.orig_path == str(folder / rel_path)
+
+    contents = read_text_file_contents(bundle)
+    assert contents == {f"file_{index}.txt": f"content {index}" for index in range(3)}
+
+
+def test_incremental_deduplicated_import(tmp_path):
+
+    folder = tmp_path / "corpus"
+    folder.mkdir()
+    (folder / "a.txt").write_text("same content")
+    (folder / "b.txt").write_text("same content")
+    manifest_path = str(tmp_path / "manifest.json")
+
+    bundle = import_folder(
+        str(folder), FolderImportConfig(), manifest_path=manifest_path, deduplicate=True
+    )
+    assert read_text_file_contents(bundle) == {
+        "a.txt": "same content",
+        "b.txt": "same content",
+    }
+
+    (folder / "a.txt").write_text("edited content")
+
+    bundle = import_folder(
+        str(folder), FolderImportConfig(), manifest_path=manifest_path, deduplicate=True
+    )
+    assert read_text_file_contents(bundle) == {
+        "a.txt": "edited content",
+        "b.txt": "same content",
+    }
+
+
+def test_deduplicated_import(tmp_path):
+
+    folder = tmp_path / "corpus"
+    folder.mkdir()
+    (folder / "a.txt").write_text("same content")
+    (folder / "b.txt").write_text("same content")
+    (folder / "c.txt").write_text("other content")
+
+    bundle = import_folder(str(folder), FolderImportConfig(), deduplicate=True)
+
+    for rel_path, file_model in bundle.included_files.items():
+        assert file_model.orig_filename == rel_path
+        assert file_model.orig_path == str(folder / rel_path)
+    assert read_text_file_contents(bundle) == {
+        "a.txt": "same content",
+        "b.txt": "same content",
+        "c.txt": "other content",
+    }
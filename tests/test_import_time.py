@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""Import time budget for `kiara_modules_default`.
+
+*kiara* imports every module of this package at startup (to discover the modules it provides), so importing them needs
+to stay cheap. Heavy dependencies must only be imported when a module is actually used. The budgets can be adjusted with
+the ``KIARA_MODULES_IMPORT_BUDGET`` environment variable (in seconds).
+"""
+
+import pytest  # noqa
+
+import json
+import os
+import subprocess
+import sys
+import typing
+
+IMPORT_BUDGET = float(os.environ.get("KIARA_MODULES_IMPORT_BUDGET", "0.5"))
+
+HEAVY_DEPENDENCIES = [
+    "dateutil",
+    "networkx",
+    "numpy",
+    "pandas",
+    "pkg_resources",
+    "pyarrow",
+]
+
+MODULES = [
+    "kiara_modules.default.array_data",
+    "kiara_modules.default.data_onboarding",
+    "kiara_modules.default.dev",
+    "kiara_modules.default.instrumentation",
+    "kiara_modules.default.logic_gates",
+    "kiara_modules.default.memoization",
+    "kiara_modules.default.network_analysis",
+    "kiara_modules.default.pipeline_fusion",
+    "kiara_modules.default.pipeline_manifest",
+    "kiara_modules.default.profiling",
+    "kiara_modules.default.scratchpad",
+    "kiara_modules.default.strings",
+    "kiara_modules.default.tabular_data",
+    "kiara_modules.default.topic_modelling",
+]
+
+IMPORT_SCRIPT = """
+import importlib, json, sys, time
+for module in {preload}:
+    importlib.import_module(module)
+before = set(sys.modules.keys())
+start = time.perf_counter()
+importlib.import_module({module!r})
+{extra}
+duration = time.perf_counter() - start
+new = sorted(set(m.split(".")[0] for m in set(sys.modules.keys()) - before))
+print(json.dumps({{"duration": duration, "new": new}}))
+"""
+
+
+def measure_import(
+    module: str, preload: typing.Iterable[str] = (), extra: str = ""
+) -> typing.Dict[str, typing.Any]:
+    """Import a module in a fresh interpreter, and return the time it took, and the top-level modules it loaded."""
+
+    script = IMPORT_SCRIPT.format(module=module, preload=list(preload), extra=extra)
+    env = dict(os.environ)
+    src = os.path.join(os.path.dirname(os.path.dirname(__file__)), "src")
+    env["PYTHONPATH"] = os.pathsep.join([src, env.get("PYTHONPATH", "")])
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        env=env,
+        stdout=subprocess.PIPE,
+        check=True,
+        universal_newlines=True,
+    )
+    return json.loads(result.stdout.strip().split("\n")[-1])
+
+
+def test_package_import_time():
+
+    result = measure_import(
+        "kiara_modules.default",
+        extra="sys.modules['kiara_modules.default'].get_version()",
+    )
+
+    heavy = [m for m in result["new"] if m in HEAVY_DEPENDENCIES]
+    assert not heavy, f"Importing the package loads heavy dependencies: {heavy}"
+    assert result["duration"] < IMPORT_BUDGET
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_module_import_time(module: str):
+
+    pytest.importorskip("kiara")
+
+    # kiara itself is already loaded when it discovers the modules of this package
+    result = measure_import(module, preload=("kiara", "pydantic"))
+
+    heavy = [m for m in result["new"] if m in HEAVY_DEPENDENCIES]
+    assert not heavy, f"Importing '{module}' loads heavy dependencies: {heavy}"
+    assert result["duration"] < IMPORT_BUDGET
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+import pytest  # noqa
+
+import pstats
+
+from kiara_modules.default.instrumentation import (
+    JsonLinesSink,
+    LogSink,
+    MemorySink,
+    ProcessMetrics,
+    add_sink,
+    create_sink,
+    get_sinks,
+    instrumented,
+    remove_sink,
+)
+from kiara_modules.default.profiling import disable_profiling, enable_profiling
+
+
+@instrumented
+class DummyModule(object):
+
+    _module_type_name = "dummy"
+    id = "dummy_step"
+
+    def process(self, inputs, outputs):
+
+        if inputs.values["text"] == "fail":
+            raise Exception("failed")
+        outputs.values["text"] = inputs.values["text"].upper()
+
+
+def test_instrumentation_sinks(value_set):
+
+    module = DummyModule()
+    outputs = value_set()
+    module.process(inputs=value_set(text="abc"), outputs=outputs)
+    assert outputs.values == {"text": "ABC"}
+
+    sink = add_sink(MemorySink())
+    try:
+        module.process(inputs=value_set(text="abcd"), outputs=outputs)
+        with pytest.raises(Exception):
+            module.process(inputs=value_set(text="fail"), outputs=outputs)
+    finally:
+        remove_sink(sink)
+
+    assert sink not in get_sinks()
+    first, second = sink.records
+    assert isinstance(first, ProcessMetrics)
+    assert first.module_type == "dummy"
+    assert first.module_id == "dummy_step"
+    assert first.bytes_in == 4 and first.bytes_out == 4
+    assert first.error is None
+    assert second.error == "failed"
+
+
+def test_create_sink(tmp_path):
+
+    assert isinstance(create_sink("log"), LogSink)
+
+    path = tmp_path / "metrics.jsonl"
+    sink = create_sink(f"jsonl:{path}")
+    assert isinstance(sink, JsonLinesSink)
+    sink.record(
+        ProcessMetrics(
+            module_type="dummy",
+            module_id="dummy_step",
+            started=0.0,
+            wall_time=1.0,
+            cpu_time=1.0,
+        )
+    )
+    assert ProcessMetrics.parse_raw(path.read_text()).wall_time == 1.0
+
+    with pytest.raises(ValueError):
+        create_sink("invalid")
+
+
+def test_profiling(tmp_path, value_set):
+
+    module = DummyModule()
+    outputs = value_set()
+
+    enable_profiling(str(tmp_path), targets=["other"])
+    try:
+        module.process(inputs=value_set(text="abc"), outputs=outputs)
+        assert not list(tmp_path.iterdir())
+
+        enable_profiling(str(tmp_path), targets=["dummy"])
+        module.process(inputs=value_set(text="abc"), outputs=outputs)
+    finally:
+        disable_profiling()
+
+    assert outputs.values == {"text": "ABC"}
+    assert sorted(p.suffix for p in tmp_path.iterdir()) == [".collapsed", ".pstats"]
+    pstats.Stats(str(next(tmp_path.glob("*.pstats"))))
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+import pytest  # noqa
+
+import os
+
+from kiara_modules.default.instrumentation import instrumented
+from kiara_modules.default.memoization import (
+    _get_data_size,
+    disable_memoization,
+    enable_memoization,
+    get_cache_key,
+    get_memoization_stats,
+)
+
+
+@instrumented
+class DeterministicModule(object):
+
+    _module_type_name = "deterministic"
+    calls = 0
+
+    @classmethod
+    def is_deterministic(cls) -> bool:
+        return True
+
+    def process(self, inputs, outputs):
+
+        DeterministicModule.calls += 1
+        outputs.set_values(text=inputs.values["text"] * 10)
+
+
+@instrumented
+class DeterministicListModule(object):
+
+    _module_type_name = "deterministic_list"
+
+    @classmethod
+    def is_deterministic(cls) -> bool:
+        return True
+
+    def process(self, inputs, outputs):
+
+        outputs.set_values(items=list(inputs.values["text"]))
+
+
+def run(value_set, text: str) -> str:
+
+    outputs = value_set(text=None)
+    DeterministicModule().process(inputs=value_set(text=text), outputs=outputs)
+    return outputs.values["text"]
+
+
+def test_memoization(tmp_path, value_set):
+
+    DeterministicModule.calls = 0
+    assert run(value_set, "a") == "a" * 10
+    assert run(value_set, "a") == "a" * 10
+    assert DeterministicModule.calls == 2
+
+    cache = enable_memoization(cache_dir=str(tmp_path))
+    try:
+        assert run(value_set, "a") == "a" * 10
+        assert run(value_set, "a") == "a" * 10
+        assert run(value_set, "b") == "b" * 10
+        assert DeterministicModule.calls == 4
+
+        cache.clear()
+        assert run(value_set, "a") == "a" * 10
+        assert DeterministicModule.calls == 4
+
+        stats = get_memoization_stats()["deterministic"]
+        assert stats["memory_hits"] == 1
+        assert stats["disk_hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["hit_rate"] == 0.5
+    finally:
+        disable_memoization()
+
+
+def test_memoization_eviction(value_set):
+
+    DeterministicModule.calls = 0
+    result_size = _get_data_size("a" * 100)
+    cache = enable_memoization(max_memory_bytes=2 * result_size)
+    try:
+        for text in ["a", "b", "c", "d", "e"]:
+            run(value_set, text * 10)
+        assert cache.memory_items == 2
+        assert cache.memory_bytes == 2 * result_size
+
+        run(value_set, "d" * 10)
+        run(value_set, "e" * 10)
+        assert DeterministicModule.calls == 5
+        run(value_set, "a" * 10)
+        assert DeterministicModule.calls == 6
+    finally:
+        disable_memoization()
+
+
+def test_memoization_copies_mutable_results(value_set):
+
+    enable_memoization()
+    try:
+        first = value_set(items=None)
+        DeterministicListModule().process(inputs=value_set(text="abc"), outputs=first)
+        first.values["items"].append("d")
+
+        second = value_set(items=None)
+        DeterministicListModule().process(inputs=value_set(text="abc"), outputs=second)
+        assert second.values["items"] == ["a", "b", "c"]
+        assert get_memoization_stats()["deterministic_list"]["memory_hits"] == 1
+    finally:
+        disable_memoization()
+
+
+class DummyFileModel(object):
+    def __init__(self, path, import_time):
+        self.orig_filename = os.path.basename(path)
+        self.orig_path = path
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.import_time = import_time
+
+
+def test_memoization_file_keys(tmp_path, value_set):
+
+    pytest.importorskip("kiara")
+
+    path = tmp_path / "file.txt"
+    path.write_text("content")
+    module = DeterministicModule()
+
+    first = get_cache_key(module, value_set(file=DummyFileModel(str(path), "1")))
+    second = get_cache_key(module, value_set(file=DummyFileModel(str(path), "2")))
+    assert first == second
+
+    os.utime(path, ns=(0, 0))
+    third = get_cache_key(module, value_set(file=DummyFileModel(str(path), "2")))
+    assert third != first